@@ -13,6 +13,7 @@ from __future__ import annotations
 import argparse
 import json
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Iterable
 
@@ -59,12 +60,24 @@ def load_packages(args: argparse.Namespace) -> list[str]:
     return sorted(pkgs)
 
 
-def iter_scans(packages: Iterable[str], language: str, risk: str, score: float):
+def iter_scans(packages: Iterable[str], language: str, risk: str, score: float, jobs: int = 1):
     context = {"riskLevel": risk, "score": score, "originalLanguage": language}
-    for pkg in packages:
-        payload = {"packageName": pkg, "language": language, "context": context}
-        result = vm_sandbox.handle_deep_scan_request(payload)
-        yield pkg, payload, result
+    payloads = [{"packageName": pkg, "language": language, "context": context} for pkg in packages]
+    if jobs <= 1:
+        for payload in payloads:
+            yield payload["packageName"], payload, vm_sandbox.handle_deep_scan_request(payload)
+        return
+
+    # Each scan is a long-running sandbox call, so overlap them; results are still
+    # yielded in input order
+    executor = ThreadPoolExecutor(max_workers=jobs)
+    try:
+        futures = [executor.submit(vm_sandbox.handle_deep_scan_request, payload) for payload in payloads]
+        for payload, future in zip(payloads, futures, strict=True):
+            yield payload["packageName"], payload, future.result()
+    finally:
+        # Don't wait for the whole queue on Ctrl+C; only running scans finish
+        executor.shutdown(wait=False, cancel_futures=True)
 
 
 def format_summary(pkg: str, result: dict) -> str:
@@ -89,6 +102,7 @@ def main() -> int:
     parser.add_argument("--language", default="python", help="Language (python/javascript/typescript)")
     parser.add_argument("--risk", default="high", help="Risk level to feed into context (low/medium/high)")
     parser.add_argument("--score", type=float, default=0.9, help="Prior score to feed into context (0-1)")
+    parser.add_argument("--jobs", type=int, default=1, help="Number of packages to scan concurrently")
     parser.add_argument(
         "--out",
         type=str,
@@ -105,7 +119,7 @@ def main() -> int:
 
     print(f"Scanning {len(packages)} packages as {language}...")
     records = []
-    for pkg, payload, result in iter_scans(packages, language, args.risk, args.score):
+    for pkg, payload, result in iter_scans(packages, language, args.risk, args.score, args.jobs):
         print(format_summary(pkg, result))
         records.append({"package": pkg, "payload": payload, "response": result})
 
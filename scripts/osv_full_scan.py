@@ -13,11 +13,13 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import sys
 import time
+import urllib.error
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Iterable, List, Set, Tuple
 
 # Ensure we can import slopspotter from the mono-repo layout
 ROOT = Path(__file__).resolve().parents[1]
@@ -27,36 +29,99 @@ if str(CLI_SRC) not in sys.path:
 
 from slopspotter import vm_sandbox  # type: ignore  # noqa: E402
 
+HAS_ORJSON = True
+try:
+    import orjson
+except ImportError:
+    HAS_ORJSON = False
+
+json_loads = orjson.loads if HAS_ORJSON else json.loads
+
+
+def json_dumps_bytes(obj) -> bytes:
+    if HAS_ORJSON:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+
 OSV_API = "https://api.github.com/repos/ossf/malicious-packages/contents/osv/malicious/{eco}?ref=main"
 
+OSV_CACHE_DIR = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "slopspotter" / "osv"
+"""Where OSV listings and their ETags are cached between runs."""
+
+
+def github_headers() -> dict[str, str]:
+    headers = {"Accept": "application/vnd.github+json", "User-Agent": "slopspotter-osv-scan"}
+    token = os.getenv("GITHUB_TOKEN")
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    return headers
+
+
+def github_get(url: str, extra_headers: dict[str, str] | None = None) -> tuple[int, str | None, bytes]:
+    """GET `url` from the GitHub API and return (status, ETag, body)."""
+    request = urllib.request.Request(url, headers={**github_headers(), **(extra_headers or {})})
+    try:
+        with urllib.request.urlopen(request, timeout=30) as resp:
+            return resp.status, resp.headers.get("ETag"), resp.read()
+    except urllib.error.HTTPError as e:
+        # urlopen raises for 304 and error statuses; the caller decides what to do
+        return e.code, e.headers.get("ETag"), e.read()
+
 
-def fetch_osv_packages(ecosystem: str) -> List[str]:
+def fetch_osv_listing(ecosystem: str) -> bytes:
+    """Fetch the raw OSV directory listing, revalidating a cached copy by ETag."""
     url = OSV_API.format(eco=ecosystem)
-    with urllib.request.urlopen(url) as resp:
-        data = json.load(resp)
+    body_cache = OSV_CACHE_DIR / f"{ecosystem}.json"
+    etag_cache = OSV_CACHE_DIR / f"{ecosystem}.etag"
+
+    conditional = {}
+    if body_cache.exists() and etag_cache.exists():
+        conditional["If-None-Match"] = etag_cache.read_text().strip()
+
+    status, etag, body = github_get(url, conditional)
+    if status == 304:
+        try:
+            return body_cache.read_bytes()
+        except FileNotFoundError:
+            # The cached listing vanished since it was checked; fetch it in full
+            status, etag, body = github_get(url)
+    if status != 200:
+        raise RuntimeError(f"GitHub API returned HTTP {status} for {url}")
+    if etag:
+        OSV_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        body_cache.write_bytes(body)
+        etag_cache.write_text(etag)
+    return body
+
+
+def fetch_osv_packages(ecosystem: str) -> list[str]:
+    data = json_loads(fetch_osv_listing(ecosystem))
     return [item["name"] for item in data if item.get("type") == "dir"]
 
 
-def load_seen(out_path: Path) -> Set[Tuple[str, str]]:
-    seen: Set[Tuple[str, str]] = set()
+def load_seen(out_path: Path) -> set[tuple[str, str]]:
+    seen: set[tuple[str, str]] = set()
     if not out_path.exists():
         return seen
-    for line in out_path.read_text().splitlines():
-        if not line.strip():
-            continue
-        try:
-            obj = json.loads(line)
-            pkg = obj.get("package")
-            lang = obj.get("language") or (obj.get("payload") or {}).get("language")
-            if pkg and lang:
-                seen.add((pkg, str(lang).lower()))
-        except json.JSONDecodeError:
-            continue
+    # Stream line by line so multi-MB resume files are never held in memory at once
+    with out_path.open("rb") as fh:
+        for line in fh:
+            if not line.strip():
+                continue
+            try:
+                obj = json_loads(line)
+                pkg = obj.get("package")
+                lang = obj.get("language") or (obj.get("payload") or {}).get("language")
+                if pkg and lang:
+                    seen.add((pkg, str(lang).lower()))
+            except json.JSONDecodeError:  # orjson's error subclasses this
+                continue
     return seen
 
 
-def build_worklist(ecosystem: str) -> List[Tuple[str, str]]:
-    work: List[Tuple[str, str]] = []
+def build_worklist(ecosystem: str) -> list[tuple[str, str]]:
+    work: list[tuple[str, str]] = []
     if ecosystem in ("pypi", "all"):
         for name in fetch_osv_packages("pypi"):
             work.append((name, "python"))
@@ -66,6 +131,17 @@ def build_worklist(ecosystem: str) -> List[Tuple[str, str]]:
     return work
 
 
+def scan_package(pkg: str, lang: str, risk: str, score: float) -> dict:
+    t0 = time.monotonic()
+    payload = {"packageName": pkg, "language": lang, "context": {"riskLevel": risk, "score": score, "originalLanguage": lang}}
+    try:
+        result = vm_sandbox.handle_deep_scan_request(payload)
+    except Exception as exc:  # keep going on errors
+        result = {"success": False, "error": str(exc)}
+    elapsed = time.monotonic() - t0
+    return {"package": pkg, "language": lang, "payload": payload, "response": result, "elapsed": elapsed}
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="Scan all OSSF malicious packages via Slopspotter")
     parser.add_argument("--ecosystem", choices=["pypi", "npm", "all"], default="all", help="Which ecosystem to scan")
@@ -73,6 +149,7 @@ def main() -> int:
     parser.add_argument("--score", type=float, default=0.9, help="Prior score context passed to sandbox")
     parser.add_argument("--limit", type=int, help="Optional limit on number of packages to scan")
     parser.add_argument("--out", type=str, default="osv_scan_results.ndjson", help="Output NDJSON path (append/resume)")
+    parser.add_argument("--jobs", type=int, default=1, help="Number of packages to scan concurrently")
     args = parser.parse_args()
 
     out_path = Path(args.out)
@@ -90,24 +167,27 @@ def main() -> int:
 
     print(f"Scanning {len(todo)} package(s); writing to {out_path}", flush=True)
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    with out_path.open("a", encoding="utf-8") as fh:
-        for idx, (pkg, lang) in enumerate(todo, start=1):
-            t0 = time.monotonic()
-            payload = {"packageName": pkg, "language": lang, "context": {"riskLevel": args.risk, "score": args.score, "originalLanguage": lang}}
-            try:
-                result = vm_sandbox.handle_deep_scan_request(payload)
-            except Exception as exc:  # keep going on errors
-                result = {"success": False, "error": str(exc)}
-            elapsed = time.monotonic() - t0
-            record = {"package": pkg, "language": lang, "payload": payload, "response": result, "elapsed": elapsed}
-            fh.write(json.dumps(record) + "\n")
-            fh.flush()
-
-            # Console summary (flush to keep logs informative)
-            success = result.get("success", False) if isinstance(result, dict) else False
-            verdict = result.get("result", {}).get("isMalicious") if isinstance(result, dict) else None
-            conf = result.get("result", {}).get("confidence") if isinstance(result, dict) else None
-            print(f"[{idx}/{len(todo)}] {pkg} ({lang}) -> success={success} verdict={verdict} conf={conf} elapsed={elapsed:.1f}s", flush=True)
+    # Scans are dominated by Docker/VM time, so run them on worker threads. Only
+    # this thread writes to the output file, in completion order.
+    with out_path.open("ab") as fh, ThreadPoolExecutor(max_workers=max(args.jobs, 1)) as executor:
+        futures = [executor.submit(scan_package, pkg, lang, args.risk, args.score) for pkg, lang in todo]
+        try:
+            for idx, future in enumerate(as_completed(futures), start=1):
+                record = future.result()
+                fh.write(json_dumps_bytes(record) + b"\n")
+                # Flush every record so a crash never loses a finished scan
+                fh.flush()
+
+                # Console summary (flush to keep logs informative)
+                pkg, lang, result, elapsed = record["package"], record["language"], record["response"], record["elapsed"]
+                success = result.get("success", False) if isinstance(result, dict) else False
+                verdict = result.get("result", {}).get("isMalicious") if isinstance(result, dict) else None
+                conf = result.get("result", {}).get("confidence") if isinstance(result, dict) else None
+                print(f"[{idx}/{len(todo)}] {pkg} ({lang}) -> success={success} verdict={verdict} conf={conf} elapsed={elapsed:.1f}s", flush=True)
+        except KeyboardInterrupt:
+            # Don't wait for the whole queue on Ctrl+C; re-running resumes from the output
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
     print("Done.")
     return 0
 
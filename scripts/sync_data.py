@@ -32,36 +32,36 @@ def running_in_scripts_dir():
 
 def read_pyproject_toml():
     """Open the `pyproject.toml` file and return the data."""
-    try:
-        with open(PYPROJECT_FILE, "rb") as pyproject_file:
-            pyproject_data = tomllib.load(pyproject_file)
-    except (FileNotFoundError, tomllib.TOMLDecodeError) as error:
-        raise error
-    return pyproject_data
+    with open(PYPROJECT_FILE, "rb") as pyproject_file:
+        return tomllib.loads(pyproject_file.read().decode("utf-8"))
 
 
 def read_manifest_json():
     """Open the `manifest.json` file and return the data."""
-    try:
-        with open(MANIFEST_FILE, "r") as manifest_file:
-            manifest_data = json.load(manifest_file)
-    except (FileNotFoundError, json.JSONDecodeError) as error:
-        raise error
-    return manifest_data
+    with open(MANIFEST_FILE, "rb") as manifest_file:
+        return json.loads(manifest_file.read())
 
 
 def read_constants_json(constants_json_path: str):
     """Open the `constants.json` file at the given path and return the data."""
-    try:
-        with open(constants_json_path, "r") as file:
-            constants = json.load(file)
-    except (FileNotFoundError, json.JSONDecodeError) as error:
-        raise error
-    return constants
+    with open(constants_json_path, "rb") as file:
+        return json.loads(file.read())
+
+
+def write_json_atomic(json_path: str, data):
+    """Serialize `data` in one buffer and atomically replace the file at `json_path`."""
+    payload = json.dumps(data, indent=2).encode("utf-8")
+    tmp_path = json_path + ".tmp"
+    with open(tmp_path, "wb") as tmp_file:
+        tmp_file.write(payload)
+    os.replace(tmp_path, json_path)
 
 
-def copy_metadata():
-    """Copy metadata from the `slopspotter-cli` Python Project to the `slopspotter-cli` Firefox extension."""
+def copy_metadata() -> Dict:
+    """Copy metadata from the `slopspotter-cli` Python Project to the `slopspotter-cli` Firefox extension.
+
+    Returns the updated manifest data, so later steps need not re-read it from disk.
+    """
     pyproject_data = read_pyproject_toml()
     manifest_data = read_manifest_json()
 
@@ -80,8 +80,8 @@ def copy_metadata():
     manifest_data["homepage_url"] = homepage
     manifest_data["author"] = ", ".join(author.get("name") for author in authors)
 
-    with open(MANIFEST_FILE, "w") as manifest_file:
-        json.dump(manifest_data, manifest_file, indent=2)
+    write_json_atomic(MANIFEST_FILE, manifest_data)
+    return manifest_data
 
 
 if __name__ == "__main__":
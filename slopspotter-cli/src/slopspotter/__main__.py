@@ -2,10 +2,12 @@
 """Main entry point for `slopspotter`."""
 
 import argparse
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 import sys
-from importlib.metadata import metadata
 
 from transformers import (
     AutoModelForCausalLM,
@@ -15,48 +17,136 @@ from transformers import (
 )
 
 from slopspotter import manifests
-from slopspotter.constants import SLOPSPOTTER_VERSION, SUPPORTED_BROWSERS
-from slopspotter.messaging import NativeMessage
-from slopspotter.scoring import handle_check_packages
+from slopspotter.constants import (
+    SLOPSPOTTER_SUMMARY,
+    SLOPSPOTTER_VERSION,
+    SUPPORTED_BROWSERS,
+)
+from slopspotter.llm_decisions import inference_dtype
+from slopspotter.messaging import (
+    PONG_MESSAGE,
+    NativeMessage,
+    send_messages,
+    stdin_has_message,
+)
+from slopspotter.scoring import handle_check_packages, handle_check_packages_batch
 from slopspotter.vm_sandbox import handle_deep_scan_request
 
 logger = logging.getLogger(__name__)
 
-logging.basicConfig(
-    filename=r"C:\Users\haora\Desktop\slopspotter_debug.log",
-    level=logging.DEBUG,
-    encoding="utf-8",
-    format="%(asctime)s - PID %(process)d [%(levelname)s]: %(message)s",
-)
+LOG_FILE = r"C:\Users\haora\Desktop\slopspotter_debug.log"
+"""Where the native host writes its debug log."""
+
+LOG_FORMAT = "%(asctime)s - PID %(process)d [%(levelname)s]: %(message)s"
+"""Format of each line in the debug log."""
+
+LOG_LEVEL = os.getenv("SLOPSPOTTER_LOG_LEVEL", "DEBUG").upper()
+"""Minimum level of logged records; e.g. ``INFO`` skips the per-message logs."""
+
+
+def configure_logging() -> None:
+    """Write debug logs to the log file from a background thread.
+
+    Logging calls only put records on an in-memory queue; a ``QueueListener``
+    thread writes them to disk, so the messaging loop never waits on the file.
+    The listener is stopped (and the queue drained) when the process exits.
+    An invalid ``LOG_LEVEL`` falls back to ``DEBUG`` instead of stopping the host.
+    """
+    level = LOG_LEVEL if LOG_LEVEL in logging.getLevelNamesMapping() else "DEBUG"
+    file_handler = logging.FileHandler(LOG_FILE, encoding="utf-8")
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, file_handler)
+    logging.basicConfig(
+        level=level, handlers=[logging.handlers.QueueHandler(log_queue)]
+    )
+    listener.start()
+    atexit.register(listener.stop)
+
+
+def handle_message(
+    native_message: NativeMessage, tokenizer: PreTrainedTokenizer
+) -> NativeMessage | None:
+    """Compute the reply to a single request from the extension, if any.
+
+    Pings are answered by ``loop`` directly.
+    """
+    if not isinstance(native_message.content, dict):
+        return None
+
+    content = native_message.content
+    msg_type = content.get("type", "check-packages")
+
+    logging.debug("Received message type: %s", msg_type)
+
+    if msg_type == "deep-scan":
+        # Handle deep scan request (VM-based analysis)
+        logging.debug("Processing deep scan request")
+        response = handle_deep_scan_request(content.get("payload", content))
+        logging.debug("Deep scan response: %s", response)
+    else:
+        # Default: handle package check request
+        logging.debug("Processing check-packages request")
+        response = handle_check_packages(content, tokenizer)
+        logging.debug("Response: %s", response)
+
+    return NativeMessage.from_content(response)
+
+
+def is_check_packages(native_message: NativeMessage) -> bool:
+    """Return ``True`` if the message is a check-packages request."""
+    content = native_message.content
+    return (
+        isinstance(content, dict)
+        and content.get("type", "check-packages") != "deep-scan"
+    )
 
 
 def loop(model: PreTrainedModel, tokenizer: PreTrainedTokenizer):
-    """Main background function."""
+    """Main background function.
+
+    Blocks until a message arrives, then also reads every message that is already
+    waiting on STDIN. The check-packages requests in the burst are scored
+    together, so their registry lookups overlap, but every message still gets its
+    reply in the order it arrived. If STDIN closes mid-burst, the messages read so
+    far are answered before exiting.
+    """
     try:
-        native_message = NativeMessage.from_stdin()
-
-        if native_message.content == "ping":
-            logging.debug("Received ping. Sending pong...")
-            response = NativeMessage.from_content("pong")
-            response.to_stdout()
-        elif isinstance(native_message.content, dict):
-            content = native_message.content
-            msg_type = content.get("type", "check-packages")
-
-            logging.debug("Received message type: %s", msg_type)
-
-            if msg_type == "deep-scan":
-                # Handle deep scan request (VM-based analysis)
-                logging.debug("Processing deep scan request")
-                response = handle_deep_scan_request(content.get("payload", content))
-                logging.debug("Deep scan response: %s", response)
-            else:
-                # Default: handle package check request
-                logging.debug("Processing check-packages request")
-                response = handle_check_packages(content, tokenizer)
+        messages = [NativeMessage.from_stdin()]
+        stdin_closed = None
+        while stdin_has_message():
+            try:
+                messages.append(NativeMessage.from_stdin())
+            except EOFError as e:
+                stdin_closed = e
+                break
+        logging.debug("Received a burst of %d message(s)", len(messages))
+
+        checks = [message.content for message in messages if is_check_packages(message)]
+        check_responses = None
+        replies: list[NativeMessage] = []
+        for message in messages:
+            if message.content == "ping":
+                replies.append(PONG_MESSAGE)
+            elif is_check_packages(message):
+                if check_responses is None:
+                    # Don't hold back the replies that are ready during the scoring
+                    send_messages(replies)
+                    replies.clear()
+                    check_responses = iter(
+                        handle_check_packages_batch(checks, tokenizer)
+                    )
+                response = next(check_responses)
                 logging.debug("Response: %s", response)
-
-            NativeMessage.from_content(response).to_stdout()
+                replies.append(NativeMessage.from_content(response))
+            elif isinstance(message.content, dict):
+                send_messages(replies)
+                replies.clear()
+                replies.append(handle_message(message, tokenizer))
+        send_messages(replies)
+
+        if stdin_closed is not None:
+            raise stdin_closed
     except Exception as e:
         logging.debug(e)
         sys.exit(1)
@@ -64,10 +154,11 @@ def loop(model: PreTrainedModel, tokenizer: PreTrainedTokenizer):
 
 def main() -> int:
     """Main entry point for `slopspotter`."""
+    configure_logging()
     logging.debug("starting __main__.main()")
     parser = argparse.ArgumentParser(
         prog="slopspotter",
-        description=metadata("slopspotter")["Summary"],
+        description=SLOPSPOTTER_SUMMARY,
     )
     parser.add_argument(
         "manifest_path",
@@ -94,7 +185,7 @@ def main() -> int:
         help="Print the current version and exit.",
     )
     args = parser.parse_args(sys.argv[1:])
-    logging.debug("Received args: " + str(vars(args)))
+    logging.debug("Received args: %s", vars(args))
 
     if args.version:
         print(SLOPSPOTTER_VERSION)
@@ -114,8 +205,10 @@ def main() -> int:
         return 1
 
     model = AutoModelForCausalLM.from_pretrained(
-        "Qwen/Qwen2.5-Coder-0.5B-Instruct", device_map="auto"
-    )
+        "Qwen/Qwen2.5-Coder-0.5B-Instruct",
+        dtype=inference_dtype(),
+        device_map="auto",
+    ).eval()
     tokenizer = AutoTokenizer.from_pretrained(
         "Qwen/Qwen2.5-Coder-0.5B-Instruct", device_map="auto"
     )
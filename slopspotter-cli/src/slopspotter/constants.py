@@ -2,6 +2,7 @@
 
 import os
 import shutil
+from functools import cache
 from importlib.metadata import metadata
 from typing import Any, Literal
 
@@ -11,9 +12,15 @@ ADDON_ID = "slopspotter@bu.edu"
 NATIVE_TO_BACKGROUND_PORT = "slopspotter"
 """Name of the native port for backend-to-frontend communication."""
 
-SLOPSPOTTER_VERSION = metadata("slopspotter")["Version"]
+SLOPSPOTTER_METADATA = metadata("slopspotter")
+"""This package's distribution metadata, read from disk once per process."""
+
+SLOPSPOTTER_VERSION = SLOPSPOTTER_METADATA["Version"]
 """Version number of this package, stored in this project's metadata."""
 
+SLOPSPOTTER_SUMMARY = SLOPSPOTTER_METADATA["Summary"]
+"""One-line description of this package, stored in this project's metadata."""
+
 SUPPORTED_BROWSERS: set[str] = {
     "firefox",
 }
@@ -30,52 +37,93 @@ SUPPORTED_PLATFORMS: set[str] = {
 SupportedPlatform = Literal["darwin", "linux", "win32"]
 """Supported OS platforms."""
 
-EXECUTABLE_PATH = shutil.which("slopspotter")
-"""Executable path of this application."""
 
-MANIFEST_JSONS: dict[SupportedBrowser, dict[str, Any]] = {
-    "firefox": {
-        "name": NATIVE_TO_BACKGROUND_PORT,
-        "description": metadata("slopspotter")["Summary"],
-        "path": EXECUTABLE_PATH,
-        "type": "stdio",
-        "allowed_extensions": [ADDON_ID],
+@cache
+def executable_path() -> str | None:
+    """Executable path of this application, looked up on ``PATH`` on first use."""
+    return shutil.which("slopspotter")
+
+
+@cache
+def manifest_jsons() -> dict[SupportedBrowser, dict[str, Any]]:
+    """Manifest dictionary definitions, sorted by browser; built on first use."""
+    return {
+        "firefox": {
+            "name": NATIVE_TO_BACKGROUND_PORT,
+            "description": SLOPSPOTTER_SUMMARY,
+            "path": executable_path(),
+            "type": "stdio",
+            "allowed_extensions": [ADDON_ID],
+        }
     }
-}
-"""Manifest dictionary definitions, sorted by browser."""
 
-UNIXLIKE_MANIFEST_SETTINGS: dict[
+
+def _with_manifest_paths(settings: dict[str, Any]) -> dict[str, Any]:
+    """Add the full ``local_paths`` & ``global_paths`` to a platform's settings.
+
+    Joining the config roots with the JSON paths here means installing manifests
+    only has to expand environment variables.
+    """
+    for scope in ("local", "global"):
+        settings[f"{scope}_paths"] = [
+            os.path.join(settings[f"{scope}_config"], json_path)
+            for json_path in settings["json_paths"]
+        ]
+    return settings
+
+
+@cache
+def unixlike_manifest_settings() -> dict[
     SupportedBrowser, dict[SupportedPlatform, dict[str, Any]]
-] = {
-    "firefox": {
-        "darwin": {
-            "global_config": os.path.join(
-                "/", "Library", "Application Support", "Mozilla"
+]:
+    """This program's manifest JSON file locations for UNIX-like OSes.
+
+    Sorted by browser, then OS.
+
+    See also https://developer.mozilla.org/en-US/docs/Mozilla/Add-ons/WebExtensions/Native_manifests#manifest_location
+    """
+    return {
+        "firefox": {
+            "darwin": _with_manifest_paths(
+                {
+                    "global_config": "/Library/Application Support/Mozilla",
+                    "local_config": "$HOME/Library/Application Support/Mozilla",
+                    "json_paths": [
+                        "NativeMessagingHosts/slopspotter.json",
+                        "ManagedStorage/slopspotter.json",
+                        "PKCS11Modules/slopspotter.json",
+                    ],
+                }
             ),
-            "local_config": os.path.join(
-                "$HOME", "Library", "Application Support", "Mozilla"
+            "linux": _with_manifest_paths(
+                {
+                    "global_config": "/usr/lib64/mozilla",
+                    "local_config": "$HOME/.mozilla",
+                    "json_paths": [
+                        "native-messaging-hosts/slopspotter.json",
+                        "managed-storage/slopspotter.json",
+                        "pkcs11-modules/slopspotter.json",
+                    ],
+                }
             ),
-            "json_paths": [
-                os.path.join("NativeMessagingHosts", "slopspotter.json"),
-                os.path.join("ManagedStorage", "slopspotter.json"),
-                os.path.join("PKCS11Modules", "slopspotter.json"),
-            ],
-        },
-        "linux": {
-            "global_config": os.path.join("/", "usr", "lib64", "mozilla"),
-            "local_config": os.path.join("$HOME", ".mozilla"),
-            "json_paths": [
-                os.path.join("native-messaging-hosts", "slopspotter.json"),
-                os.path.join("managed-storage", "slopspotter.json"),
-                os.path.join("pkcs11-modules", "slopspotter.json"),
-            ],
         },
-    },
-}
-"""This program's manifest JSON file locations for UNIX-like OSes, sorted by browser/OS.
+    }
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve the manifest constants lazily (PEP 562).
+
+    Only installing manifests needs ``EXECUTABLE_PATH``, ``MANIFEST_JSONS`` and
+    ``UNIXLIKE_MANIFEST_SETTINGS``, so other commands skip building them.
+    """
+    if name == "EXECUTABLE_PATH":
+        return executable_path()
+    if name == "MANIFEST_JSONS":
+        return manifest_jsons()
+    if name == "UNIXLIKE_MANIFEST_SETTINGS":
+        return unixlike_manifest_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-See also https://developer.mozilla.org/en-US/docs/Mozilla/Add-ons/WebExtensions/Native_manifests#manifest_location 
-"""
 
 WINDOWS_REGISTRY_SUBKEYS: dict[SupportedBrowser, list[str]] = {
     "firefox": [
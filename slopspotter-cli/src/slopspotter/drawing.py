@@ -1,39 +1,36 @@
 """Functions for drawing LLM decision trees."""
 
 import logging
+from functools import lru_cache
 from typing import Literal
 
 import networkx as nx
 
 PYGRAPHVIZ_AVAILABLE = True
 try:
-    import pygraphviz  # noqa: F401
+    import pygraphviz
 except ImportError:
     PYGRAPHVIZ_AVAILABLE = False
 
 
 def prettify_token(token: str) -> str:
     """Modify a token for printing."""
-    modified_token = ""
-    for character in token:
-        if 0x100 <= ord(character) <= 0x120:
-            modified_token += PRETTY_CONTROL_CODES[ord(character) - 0x100]
-        elif 0x00 <= ord(character) <= 0x20:
-            modified_token += PRETTY_CONTROL_CODES[ord(character)]
-        else:
-            modified_token += character
-
-    return modified_token
+    return token.translate(PRETTY_TOKEN_TABLE)
 
 
+@lru_cache(maxsize=4096)
 def format_probability(probability: float) -> str:
-    """Format the probability for printing / drawing."""
+    """Format the probability for printing / drawing.
+
+    Results are cached, since many edges of a large tree share a probability.
+    """
     if probability < 0:
         return ""
+    percent = probability * 100
+    # Compare the unscaled probability so the cut-off is exactly the same as before
     if probability > 1e-4:
-        return format(probability * 100, ".2f") + "%"
-    else:
-        return format(probability * 100, ".2e") + "%"
+        return f"{percent:.2f}%"
+    return f"{percent:.2e}%"
 
 
 def draw_decision_tree_dot(
@@ -52,41 +49,34 @@ def draw_decision_tree_dot(
         logging.warning("PyGraphviz is not set up; graph will not be drawn.")
         return
 
-    plotting_decision_tree = nx.DiGraph(decision_tree)
+    if label_type not in ("token", "token_id"):
+        msg = f"Invalid label type: {label_type}"
+        raise ValueError(msg)
 
-    for node_id in plotting_decision_tree.nodes:
-        token = prettify_token(
-            plotting_decision_tree.nodes[node_id].get("token", "")
-        ).replace("\\", "\\\\")
-        token_id = plotting_decision_tree.nodes[node_id].get("token_id", -1)
-        expected = plotting_decision_tree.nodes[node_id].get("expected", False)
+    # Build the Graphviz graph directly with just the drawing attributes, instead
+    # of annotating a full copy of the decision tree and converting that
+    dot_graph = pygraphviz.AGraph(directed=True, strict=True)
 
+    for node_id, node in decision_tree.nodes(data=True):
         if label_type == "token_id":
-            plotting_decision_tree.nodes[node_id]["label"] = token_id
-        elif label_type == "token":
-            plotting_decision_tree.nodes[node_id]["label"] = token
+            label = node.get("token_id", -1)
+        elif node_id == 0:
+            label = node["input_text"]
         else:
-            msg = f"Invalid label type: {label_type}"
-            raise ValueError(msg)
-
-        plotting_decision_tree.nodes[node_id]["fontcolor"] = (
-            "red" if expected else "black"
+            label = prettify_token(node.get("token", "")).replace("\\", "\\\\")
+        color = "red" if node.get("expected", False) else "black"
+        dot_graph.add_node(node_id, label=str(label), color=color, fontcolor=color)
+
+    for source, target, edge in decision_tree.edges(data=True):
+        color = "red" if edge.get("expected", False) else "black"
+        dot_graph.add_edge(
+            source,
+            target,
+            label=format_probability(edge.get("probability", -1)),
+            color=color,
+            fontcolor=color,
         )
-        plotting_decision_tree.nodes[node_id]["color"] = "red" if expected else "black"
-
-    if label_type == "token":
-        plotting_decision_tree.nodes[0]["label"] = plotting_decision_tree.nodes[0][
-            "input_text"
-        ]
 
-    for edge in plotting_decision_tree.edges:
-        probability = plotting_decision_tree.edges[edge].get("probability", -1)
-        expected = plotting_decision_tree.edges[edge].get("expected", False)
-        plotting_decision_tree.edges[edge]["label"] = format_probability(probability)
-        plotting_decision_tree.edges[edge]["color"] = "red" if expected else "black"
-        plotting_decision_tree.edges[edge]["fontcolor"] = "red" if expected else "black"
-
-    dot_graph = nx.nx_agraph.to_agraph(plotting_decision_tree)
     dot_graph.draw(path=png_path, prog="dot")
 
 
@@ -114,8 +104,8 @@ def draw_decision_tree_plt(
         raise ValueError(msg)
 
     edge_labels = {
-        edge_id: format_probability(decision_tree.edges[edge_id]["probability"])
-        for edge_id in decision_tree.edges
+        (source, target): format_probability(probability)
+        for source, target, probability in decision_tree.edges(data="probability")
     }
     layout = nx.multipartite_layout(decision_tree, subset_key="depth")
     nx.draw(decision_tree, pos=layout, with_labels=True, labels=labels)
@@ -158,3 +148,13 @@ PRETTY_CONTROL_CODES = [
     "␣",  # SP
 ]
 """List of alternative strings for printing ASCII control codes 0 to 32."""
+
+PRETTY_TOKEN_TABLE = {
+    **dict(enumerate(PRETTY_CONTROL_CODES)),
+    **dict(enumerate(PRETTY_CONTROL_CODES, start=0x100)),
+}
+"""``str.translate`` table replacing control codes 0 to 32 with printable strings.
+
+Byte-level BPE tokenizers shift these codes up by 0x100 (e.g. 'Ġ' for a space),
+so both the raw & shifted code points are mapped.
+"""
@@ -17,6 +17,17 @@ BACKTICK_REGEX = re.compile("(.*)`(.*)`")
 disable_progress_bar()
 
 
+def inference_dtype() -> torch.dtype:
+    """Return the dtype to load the model in on this host.
+
+    bfloat16 halves memory traffic, but is only fast on GPUs that support it
+    natively; CPUs & older GPUs keep float32.
+    """
+    if torch.cuda.is_available() and torch.cuda.is_bf16_supported():
+        return torch.bfloat16
+    return torch.float32
+
+
 def package_from_node_text(llm_node_text: str):
     """Get the package from a decision tree node's text."""
     match = BACKTICK_REGEX.match(llm_node_text)
@@ -76,12 +87,12 @@ def topk_token_probabilities(
     """
     input_ids = tokenizer.encode(input_text, return_tensors="pt").to(model.device)
 
-    with torch.no_grad():
+    with torch.inference_mode():
         outputs = model(input_ids)
         logits = outputs.logits
 
     last_token_logits = logits[0, -1, :]
-    probabilities = torch.nn.functional.softmax(last_token_logits, dim=-1)
+    probabilities = torch.nn.functional.softmax(last_token_logits.float(), dim=-1)
 
     topk_values, topk_indices = torch.topk(probabilities, k=k)
     return topk_values, topk_indices
@@ -101,12 +112,12 @@ def token_probability(
         input_ids: tokens previously generated by LLM / inputted by user
         token_id: next token ID
     """
-    with torch.no_grad():
+    with torch.inference_mode():
         outputs = model(input_ids)
         logits = outputs.logits
 
     last_token_logits = logits[0, -1, :]
-    probabilities = torch.nn.functional.softmax(last_token_logits, dim=-1)
+    probabilities = torch.nn.functional.softmax(last_token_logits.float(), dim=-1)
 
     return probabilities[token_id].item()
 
@@ -6,18 +6,19 @@ https://developer.mozilla.org/en-US/docs/Mozilla/Add-ons/WebExtensions/Native_ma
 import json
 import os
 import sys
+from functools import cache
 
 if sys.platform == "win32":
     import winreg
 
 from slopspotter.constants import (
-    EXECUTABLE_PATH,
-    MANIFEST_JSONS,
     SUPPORTED_BROWSERS,
     SUPPORTED_PLATFORMS,
-    UNIXLIKE_MANIFEST_SETTINGS,
     WINDOWS_REGISTRY_SUBKEYS,
     SupportedBrowser,
+    executable_path,
+    manifest_jsons,
+    unixlike_manifest_settings,
 )
 
 
@@ -40,18 +41,21 @@ def get_unixlike_manifest_paths(
     if sys.platform not in SUPPORTED_PLATFORMS:
         raise TypeError(f"Invalid platform: {sys.platform}")
 
-    browser_platform_settings = UNIXLIKE_MANIFEST_SETTINGS[browser][sys.platform]
+    browser_platform_settings = unixlike_manifest_settings()[browser][sys.platform]
 
-    config = (
-        browser_platform_settings["local_config"]
+    manifest_paths = (
+        browser_platform_settings["local_paths"]
         if is_local
-        else browser_platform_settings["global_config"]
+        else browser_platform_settings["global_paths"]
     )
-    json_paths = browser_platform_settings["json_paths"]
 
-    return [
-        os.path.join(os.path.expandvars(config), json_path) for json_path in json_paths
-    ]
+    return [os.path.expandvars(manifest_path) for manifest_path in manifest_paths]
+
+
+@cache
+def manifest_json_bytes(browser: SupportedBrowser) -> bytes:
+    """Return the browser's native manifest, serialized once per process."""
+    return json.dumps(manifest_jsons()[browser], indent=4).encode("utf-8")
 
 
 def install_manifests(browser: SupportedBrowser, is_local: bool = True) -> None:
@@ -81,14 +85,26 @@ def install_unixlike_manifests(
 ) -> None:
     """Install the native app manifest for UNIX-like OSes (MacOS & Linux)."""
     manifest_paths = get_unixlike_manifest_paths(browser, is_local)
-    manifest = MANIFEST_JSONS[browser]
+    manifest = manifest_jsons()[browser]
+    # Every destination gets the same document, so serialize it only once
+    manifest_bytes = manifest_json_bytes(browser)
+    # dict.fromkeys drops duplicate destinations while keeping their order
+    manifest_targets = [
+        (os.path.dirname(manifest_path), manifest_path)
+        for manifest_path in dict.fromkeys(manifest_paths)
+    ]
 
     print(f"Manifest: {manifest}")
-    for manifest_path in manifest_paths:
+    ready_dirs: set[str] = set()
+    for manifest_dir, manifest_path in manifest_targets:
         print(f"Storing manifest in {manifest_path}")
-        os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
-        with open(manifest_path, "w") as manifest_file:
-            json.dump(manifest, manifest_file, indent=4)
+        # Check each parent directory once; on repeat installs it already exists
+        if manifest_dir not in ready_dirs:
+            if not os.path.isdir(manifest_dir):
+                os.makedirs(manifest_dir, exist_ok=True)
+            ready_dirs.add(manifest_dir)
+        with open(manifest_path, "wb") as manifest_file:
+            manifest_file.write(manifest_bytes)
 
 
 def install_win32_manifests(browser: SupportedBrowser, is_local: bool = True):
@@ -101,4 +117,4 @@ def install_win32_manifests(browser: SupportedBrowser, is_local: bool = True):
 
     for sub_key in sub_keys:
         winreg.CreateKey(key, sub_key)
-        winreg.SetValue(key, sub_key, winreg.REG_SZ, EXECUTABLE_PATH)
+        winreg.SetValue(key, sub_key, winreg.REG_SZ, executable_path())
@@ -2,10 +2,127 @@
 
 import json
 import logging
-import struct
+import os
+import select
 import sys
+from collections.abc import Iterable
 from typing import Any, NamedTuple
 
+ORJSON_AVAILABLE = True
+try:
+    import orjson
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _json_dumps(content: Any) -> bytes:
+    """Serialize ``content`` to the most compact UTF-8 JSON representation."""
+    if ORJSON_AVAILABLE:
+        # orjson is compact by default; OPT_NON_STR_KEYS matches json's key coercion
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, separators=(",", ":")).encode("utf-8")
+
+
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+_LITERAL_PAYLOADS: dict[bytes, str] = {b'"ping"': "ping"}
+"""Decoded content of frequent raw payloads (e.g. the extension's keepalive)."""
+
+STDIN_READ_SIZE = 65536
+"""Initial size of the reusable STDIN buffer, i.e. the most bytes read at once."""
+
+_stdin_buffer = bytearray(STDIN_READ_SIZE)
+"""Reusable buffer that STDIN is read into."""
+
+_stdin_start = 0
+"""Offset of the first byte in ``_stdin_buffer`` not consumed as a message yet."""
+
+_stdin_end = 0
+"""Offset just past the last byte read into ``_stdin_buffer``."""
+
+
+def _fill_stdin_buffer(size: int) -> None:
+    """Read from STDIN until at least ``size`` unconsumed bytes are buffered.
+
+    Unconsumed bytes are first moved to the front of the buffer, which only grows
+    when a single message does not fit in it.
+
+    Raises:
+        EOFError: If STDIN is closed before ``size`` bytes are available.
+    """
+    global _stdin_start, _stdin_end
+    pending = _stdin_end - _stdin_start
+    _stdin_buffer[:pending] = _stdin_buffer[_stdin_start:_stdin_end]
+    _stdin_start, _stdin_end = 0, pending
+    if len(_stdin_buffer) < size:
+        _stdin_buffer.extend(bytes(size - len(_stdin_buffer)))
+    raw_stdin = sys.stdin.buffer.raw
+    with memoryview(_stdin_buffer) as view:
+        while _stdin_end < size:
+            count = raw_stdin.readinto(view[_stdin_end:])
+            if not count:
+                raise EOFError("STDIN was closed by the browser")
+            _stdin_end += count
+
+
+def _read_stdin(size: int) -> bytes:
+    """Read exactly ``size`` bytes from STDIN.
+
+    STDIN is read in large blocks into a reusable buffer and framed in memory, so
+    a short message costs one ``read()`` syscall at most instead of one for its
+    length and one for its content.
+
+    Raises:
+        EOFError: If STDIN is closed before ``size`` bytes are available.
+    """
+    global _stdin_start
+    if _stdin_end - _stdin_start < size:
+        _fill_stdin_buffer(size)
+    with memoryview(_stdin_buffer) as view:
+        data = view[_stdin_start : _stdin_start + size].tobytes()
+    _stdin_start += size
+    return data
+
+
+def _write_stdout(data: bytes) -> None:
+    """Write ``data`` directly to the STDOUT file descriptor.
+
+    This bypasses ``sys.stdout.buffer`` (and its flush) so that each frame costs
+    a single ``write()`` syscall; partial writes are retried until done.
+    """
+    fd = sys.stdout.fileno()
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view) :]
+
+
+def stdin_has_message() -> bool:
+    """Return ``True`` if reading the next message is not expected to block.
+
+    This is the case when a complete frame is already buffered, or when STDIN has
+    unread data. Windows' ``select()`` only supports sockets, so there only
+    buffered frames count.
+    """
+    pending = _stdin_end - _stdin_start
+    if pending >= 4:
+        length = int.from_bytes(
+            _stdin_buffer[_stdin_start : _stdin_start + 4], sys.byteorder
+        )
+        if pending >= 4 + length:
+            return True
+    if sys.platform == "win32":
+        return False
+    readable, _, _ = select.select([sys.stdin.fileno()], [], [], 0)
+    return bool(readable)
+
+
+def send_messages(messages: Iterable["NativeMessage"]) -> None:
+    """Send several encoded messages to STDOUT in a single write."""
+    frames = b"".join(message.frame for message in messages)
+    if frames:
+        logging.debug("Sending %d bytes of messages on STDOUT", len(frames))
+        _write_stdout(frames)
+
 
 class NativeMessage(NamedTuple):
     """A message to be sent via native messaging."""
@@ -19,20 +136,26 @@ class NativeMessage(NamedTuple):
     content: Any
     """The actual content of the native message."""
 
+    @property
+    def frame(self) -> bytes:
+        """The complete wire frame: the length prefix followed by the content."""
+        return self.raw_length + self.raw_content
+
     @classmethod
     def from_content(cls, content: Any):
         """Create & encode a native message based on its unencoded message content.
 
-        To get the most compact JSON representation, we specify (',', ':') to
-        eliminate whitespace. We want the most compact representation because the
-        browser rejects messages that exceed 1 MB.
+        To get the most compact JSON representation, we eliminate whitespace
+        (orjson does this by default; with the stdlib we specify (',', ':')). We
+        want the most compact representation because the browser rejects messages
+        that exceed 1 MB.
 
         Args:
             content: JSON-serializable message content
         """
-        raw_content = json.dumps(content, separators=(",", ":")).encode("utf-8")
+        raw_content = _json_dumps(content)
         length = len(raw_content)
-        raw_length = struct.pack("@I", length)
+        raw_length = length.to_bytes(4, sys.byteorder)
         return cls(raw_length, raw_content, length, content)
 
     @classmethod
@@ -44,19 +167,25 @@ class NativeMessage(NamedTuple):
         length in native byte order.
         """
         # Get 32-bit unsigned integer containing message length
-        raw_length = sys.stdin.buffer.read(4)
-        length = struct.unpack("@I", raw_length)[0]
+        raw_length = _read_stdin(4)
+        length = int.from_bytes(raw_length, sys.byteorder)
         logging.debug("Message length: %d", length)
         if length == 0:
             logging.warning("Received message has length 0")
-        raw_content = sys.stdin.buffer.read(length)
-        content = json.loads(raw_content)
+        raw_content = _read_stdin(length)
+        # Keepalive pings dominate the traffic; match them without parsing JSON
+        content = _LITERAL_PAYLOADS.get(raw_content)
+        if content is None:
+            content = _json_loads(raw_content)
         logging.debug("Received message: %s", content)
         return cls(raw_length, raw_content, length, content)
 
     def to_stdout(self):
         """Send the encoded message to STDOUT."""
-        logging.debug("Sending message on STDOUT: %s", str(self))
-        sys.stdout.buffer.write(self.raw_length)
-        sys.stdout.buffer.write(self.raw_content)
-        sys.stdout.buffer.flush()
+        logging.debug("Sending message on STDOUT: %s", self)
+        # Hand the browser the length and content as one contiguous write
+        _write_stdout(self.frame)
+
+
+PONG_MESSAGE = NativeMessage.from_content("pong")
+"""Pre-encoded reply to the extension's keepalive ``"ping"``."""
@@ -1,6 +1,9 @@
 """Notebook code for generating the token decision trees for top packages."""
 
+import copy
 import json
+import os
+from collections.abc import Iterator
 from itertools import product
 
 import networkx as nx
@@ -10,6 +13,7 @@ from tqdm import tqdm
 from transformers import (
     AutoModelForCausalLM,
     AutoTokenizer,
+    Cache,
     PreTrainedModel,
     PreTrainedTokenizer,
 )
@@ -19,6 +23,7 @@ from slopspotter.drawing import (
 )
 from slopspotter.llm_decisions import (
     PACKAGE_INPUT_TEMPLATE,
+    inference_dtype,
     package_from_node_text,
     reset_control_codes,
 )
@@ -33,11 +38,17 @@ PACKAGE_TREE_FILENAME = "top_pypi_packages.gml"
 DECISION_TREE_FILENAME = "decision_tree.gml"
 ENDING_STRINGS = ["`", "`\n", "`\n\n"]
 
+INFERENCE_BATCH_SIZE = 32
+"""Most decision tree nodes whose next-token probabilities share a forward pass."""
+
 CACHE_PATH = "./.data"
 memory = Memory(CACHE_PATH, verbose=1)
 
 torch.manual_seed(20251210)
 
+# Allow fast tokenizers to encode batches on several threads
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "true")
+
 
 @memory.cache
 def pypi_packages_json() -> dict:
@@ -84,33 +95,63 @@ def pypi_package_tree(
         expected=True,
     )
 
-    package_token_ids = [tokenizer.encode(package) for package in packages]
+    # One call lets a fast tokenizer encode all packages in parallel
+    package_token_ids = tokenizer(packages, return_attention_mask=False)["input_ids"]
+
+    # Packages share most of their tokens, so decode each distinct token only once
+    unique_token_ids = sorted(
+        {token_id for token_ids in package_token_ids for token_id in token_ids}
+    )
+    tokens = dict(
+        zip(
+            unique_token_ids,
+            map(
+                prettify_token,
+                tokenizer.batch_decode([[token_id] for token_id in unique_token_ids]),
+            ),
+            strict=True,
+        )
+    )
+
+    # Build the tree as a plain trie first: the child node IDs of every node keyed
+    # by token ID, plus parallel lists with the parent, token ID & depth of every
+    # new node (node i + 1 is at index i). The graph is then built in one go.
+    children: list[dict[int, int]] = [{}]
+    parent_ids: list[int] = []
+    node_token_ids: list[int] = []
+    depths: list[int] = []
 
     for tokenized_package in package_token_ids:
         current_node_id = 0
         for depth, token_id in enumerate(tokenized_package, start=1):
-            successors = list(decision_tree.successors(current_node_id))
-            successor_token_ids = [
-                decision_tree.nodes[successor]["token_id"] for successor in successors
-            ]
-            if token_id not in successor_token_ids:
-                new_node_id = decision_tree.order()
-                decision_tree.add_node(
-                    new_node_id,
-                    depth=depth + 1,
-                    token_id=token_id,
-                    token=prettify_token(tokenizer.decode(token_id)),
-                    label=prettify_token(tokenizer.decode(token_id)),
-                    expected=True,
-                )
-                decision_tree.add_edge(
-                    current_node_id,
-                    new_node_id,
-                    expected=True,
-                )
-                current_node_id = new_node_id
-            else:
-                current_node_id = successors[successor_token_ids.index(token_id)]
+            child_node_id = children[current_node_id].get(token_id)
+            if child_node_id is None:
+                child_node_id = len(children)
+                children[current_node_id][token_id] = child_node_id
+                children.append({})
+                parent_ids.append(current_node_id)
+                node_token_ids.append(token_id)
+                depths.append(depth + 1)
+            current_node_id = child_node_id
+
+    decision_tree.add_nodes_from(
+        (
+            node_id,
+            {
+                "depth": depth,
+                "token_id": token_id,
+                "token": tokens[token_id],
+                "label": tokens[token_id],
+                "expected": True,
+            },
+        )
+        for node_id, (token_id, depth) in enumerate(
+            zip(node_token_ids, depths, strict=True), start=1
+        )
+    )
+    decision_tree.add_edges_from(
+        zip(parent_ids, range(1, len(children)), strict=True), expected=True
+    )
 
     return decision_tree
 
@@ -129,16 +170,148 @@ def token_probabilities(
     """
     input_ids = tokenizer.encode(input_text, return_tensors="pt").to(model.device)
 
-    with torch.no_grad():
+    with torch.inference_mode():
         outputs = model(input_ids)
         logits = outputs.logits
 
     last_token_logits = logits[0, -1, :]
-    probabilities = torch.nn.functional.softmax(last_token_logits, dim=-1)
+    probabilities = torch.nn.functional.softmax(last_token_logits.float(), dim=-1)
+
+    return probabilities
+
+
+def suffix_token_probabilities(
+    model: PreTrainedModel,
+    prompt_cache: Cache,
+    prompt_length: int,
+    suffixes: list[list[int]],
+) -> torch.Tensor:
+    """Calculate the probabilities of the next token after a prompt & each suffix.
+
+    Only the suffixes are run through the model, in one batch, on top of a copy of
+    the prompt's KV cache. They are right-padded, so that the real tokens of every
+    row directly follow the prompt.
+
+    Args:
+        model: transformers model for causal LM
+        prompt_cache: KV cache of the prompt
+        prompt_length: number of tokens in the prompt
+        suffixes: IDs of the tokens following the prompt (at least one per suffix)
+
+    Returns:
+        A tensor with one row of next-token probabilities per suffix
+    """
+    batch_size = len(suffixes)
+    lengths = torch.tensor([len(suffix) for suffix in suffixes], device=model.device)
+    input_ids = torch.nn.utils.rnn.pad_sequence(
+        [torch.tensor(suffix) for suffix in suffixes], batch_first=True
+    ).to(model.device)
+    positions = torch.arange(input_ids.shape[1], device=model.device)
+    suffix_mask = positions < lengths[:, None]
+    attention_mask = torch.cat(
+        [
+            torch.ones(
+                (batch_size, prompt_length), dtype=torch.long, device=model.device
+            ),
+            suffix_mask.long(),
+        ],
+        dim=1,
+    )
+    # The model appends to the cache it is given, so hand it a copy with one row
+    # per suffix
+    cache = copy.deepcopy(prompt_cache)
+    cache.batch_repeat_interleave(batch_size)
+
+    with torch.inference_mode():
+        outputs = model(
+            input_ids=input_ids, attention_mask=attention_mask, past_key_values=cache
+        )
+        logits = outputs.logits
+
+    # Each row's last real token is followed by padding, so pick it out by length
+    rows = torch.arange(batch_size, device=model.device)
+    last_token_logits = logits[rows, lengths - 1]
+    probabilities = torch.nn.functional.softmax(last_token_logits.float(), dim=-1)
 
     return probabilities
 
 
+def tree_token_probabilities(
+    model: PreTrainedModel,
+    tokenizer: PreTrainedTokenizer,
+    decision_tree: nx.DiGraph,
+    node_ids: list[int],
+) -> Iterator[tuple[int, torch.Tensor]]:
+    """Calculate the probabilities of the next token for several tree nodes.
+
+    The root's prompt is run through the model only once. For every other node,
+    only the tokens generated after the prompt are run through the model, reusing
+    the prompt's KV cache, in batches of ``INFERENCE_BATCH_SIZE`` nodes.
+
+    Batches are computed lazily, so nodes may be added to the tree in between, as
+    long as the given nodes' paths from the root do not change.
+
+    Args:
+        model: transformers model for causal LM
+        tokenizer: transformers tokenizer
+        decision_tree: LLM token decision tree / package tree
+        node_ids: IDs of the nodes to calculate the probabilities for
+
+    Yields:
+        The ID & next-token probabilities of every given node, in order
+    """
+    prompt_ids = tokenizer.encode(
+        decision_tree.nodes[0]["input_text"], return_tensors="pt"
+    ).to(model.device)
+    with torch.inference_mode():
+        outputs = model(prompt_ids, use_cache=True)
+    prompt_cache = outputs.past_key_values
+    prompt_probabilities = torch.nn.functional.softmax(
+        outputs.logits[0, -1, :].float(), dim=-1
+    )
+
+    for start in range(0, len(node_ids), INFERENCE_BATCH_SIZE):
+        batch_node_ids = node_ids[start : start + INFERENCE_BATCH_SIZE]
+        suffixes = {
+            node_id: node_token_ids(decision_tree, node_id)
+            for node_id in batch_node_ids
+        }
+        # The root has no suffix; its probabilities are the prompt's
+        generated = [node_id for node_id in batch_node_ids if suffixes[node_id]]
+        batch_probabilities = {}
+        if generated:
+            batch_probabilities = dict(
+                zip(
+                    generated,
+                    suffix_token_probabilities(
+                        model,
+                        prompt_cache,
+                        prompt_ids.shape[-1],
+                        [suffixes[node_id] for node_id in generated],
+                    ),
+                    strict=True,
+                )
+            )
+        for node_id in batch_node_ids:
+            yield node_id, batch_probabilities.get(node_id, prompt_probabilities)
+
+
+def node_token_ids(decision_tree: nx.DiGraph, node_id: int) -> list[int]:
+    """Get the IDs of the tokens generated after the prompt, up to a tree node."""
+    traversal = nx.shortest_path(decision_tree, 0, node_id)
+    return [decision_tree.nodes[n]["token_id"] for n in traversal[1:]]
+
+
+def node_input_text(
+    decision_tree: nx.DiGraph, node_id: int, tokenizer: PreTrainedTokenizer
+) -> str:
+    """Determine the text generated up to (and including) a decision tree node."""
+    input_text = decision_tree.nodes[0]["input_text"]
+    if decision_tree.nodes[node_id]["depth"] != 0:
+        input_text += tokenizer.decode(node_token_ids(decision_tree, node_id))
+    return input_text
+
+
 def populate_probabilities(
     decision_tree: nx.DiGraph,
     node_id: int,
@@ -161,23 +334,53 @@ def populate_probabilities(
     if len(list(decision_tree.successors(node_id))) == 0:
         return
 
-    # Determine the input text for this node
-    node_input_text = decision_tree.nodes[0]["input_text"]
-    if decision_tree.nodes[node_id]["depth"] != 0:
-        traversal = nx.shortest_path(decision_tree, 0, node_id)
-        node_input_text += tokenizer.decode(
-            [decision_tree.nodes[n]["token_id"] for n in traversal[1:]]
-        )
-
     # Get the token probabilities
-    probabilities = token_probabilities(model, tokenizer, node_input_text)
+    probabilities = token_probabilities(
+        model, tokenizer, node_input_text(decision_tree, node_id, tokenizer)
+    )
+    annotate_probabilities(decision_tree, node_id, probabilities, tokenizer, k)
 
-    # Annotate edges with their probabilities
-    for edge in decision_tree.out_edges(node_id):
-        next_token_id = decision_tree.nodes[edge[1]]["token_id"]
-        edge_probability = probabilities[next_token_id].item()
-        decision_tree.edges[edge]["probability"] = edge_probability
-        decision_tree.edges[edge]["label"] = edge_probability
+
+def annotate_probabilities(
+    decision_tree: nx.DiGraph,
+    node_id: int,
+    probabilities: torch.Tensor,
+    tokenizer: PreTrainedTokenizer,
+    k: int = 3,
+    children: list[tuple[int, int]] | None = None,
+):
+    """Annotate the outgoing edges of a node with its next-token probabilities.
+
+    Additionally, add the top k tokens if they're not already in the decision tree.
+
+    Args:
+        decision_tree: LLM token decision tree / package tree
+        node_id: given node ID in the decision tree
+        probabilities: the node's next-token probabilities
+        tokenizer: transformers tokenizer
+        k: the k in "top-k"
+        children: the node's (child node ID, token ID) pairs, if already known
+    """
+    if children is None:
+        children = [
+            (child_id, decision_tree.nodes[child_id]["token_id"])
+            for child_id in decision_tree.successors(node_id)
+        ]
+
+    # Annotate edges with their probabilities, gathered & copied off the device
+    # at once instead of synchronizing for every edge
+    successor_token_ids = [token_id for _, token_id in children]
+    edge_probabilities = probabilities.index_select(
+        0,
+        torch.as_tensor(
+            successor_token_ids, dtype=torch.long, device=probabilities.device
+        ),
+    ).tolist()
+    for (child_id, _), edge_probability in zip(
+        children, edge_probabilities, strict=True
+    ):
+        decision_tree.edges[node_id, child_id]["probability"] = edge_probability
+        decision_tree.edges[node_id, child_id]["label"] = edge_probability
 
     # Stop here if k is 0
     if k == 0:
@@ -186,30 +389,27 @@ def populate_probabilities(
     # Get the top K most probable next tokens
     topk_values, topk_indices = torch.topk(probabilities, k=k)
 
-    # Get successor node IDs and their token IDs
-    successors = list(decision_tree.successors(node_id))
-    successor_token_ids = [
-        decision_tree.nodes[successor]["token_id"] for successor in successors
-    ]
     # Get the current depth
     current_depth = decision_tree.nodes[node_id]["depth"]
 
     # Populate decision tree with new "unexpected" tokens if missing from top K tokens
-    for top_value, top_index in zip(topk_values, topk_indices, strict=True):
-        if top_index.item() not in successor_token_ids:
+    for top_value, top_index in zip(
+        topk_values.tolist(), topk_indices.tolist(), strict=True
+    ):
+        if top_index not in successor_token_ids:
             token = reset_control_codes(tokenizer.decode(top_index))
             new_node_id = decision_tree.order()
             decision_tree.add_node(
                 new_node_id,
                 depth=current_depth + 1,
-                token_id=top_index.item(),
+                token_id=top_index,
                 token=reset_control_codes(token),
                 expected=False,
             )
             decision_tree.add_edge(
                 node_id,
                 new_node_id,
-                probability=top_value.item(),
+                probability=top_value,
                 expected=False,
             )
 
@@ -224,13 +424,11 @@ def add_generated_nodes(
 ):
     """Extend the decision tree by adding an extra layer of nodes."""
     modified_nodes = 0
-    order = decision_tree.order()
-    for node_id in range(order):
+    node_ids = []
+    for node_id in range(decision_tree.order()):
         current_depth = decision_tree.nodes[node_id]["depth"]
 
-        # Get successor node IDs and their token IDs
-        successors = list(decision_tree.successors(node_id))
-        if len(successors) >= k:
+        if decision_tree.out_degree(node_id) >= k:
             continue
 
         if current_depth != 0 and any(
@@ -242,16 +440,13 @@ def add_generated_nodes(
         if current_depth >= max_depth:
             continue
 
-        # Determine the input text for this node
-        node_input_text = decision_tree.nodes[0]["input_text"]
-        if decision_tree.nodes[node_id]["depth"] != 0:
-            traversal = nx.shortest_path(decision_tree, 0, node_id)
-            node_input_text += tokenizer.decode(
-                [decision_tree.nodes[n]["token_id"] for n in traversal[1:]]
-            )
+        node_ids.append(node_id)
 
-        # Get the token probabilities
-        probabilities = token_probabilities(model, tokenizer, node_input_text)
+    # New nodes are leaves of the nodes being extended, so the paths to the
+    # remaining nodes stay the same while the probabilities are computed
+    for node_id, probabilities in tree_token_probabilities(
+        model, tokenizer, decision_tree, node_ids
+    ):
         # Get the top K most probable next tokens
         topk_values, topk_indices = torch.topk(probabilities, k=k)
 
@@ -259,7 +454,8 @@ def add_generated_nodes(
         current_depth = decision_tree.nodes[node_id]["depth"]
 
         successor_token_ids = [
-            decision_tree.nodes[successor]["token_id"] for successor in successors
+            decision_tree.nodes[successor]["token_id"]
+            for successor in decision_tree.successors(node_id)
         ]
 
         # Populate decision tree with new "unexpected" tokens if missing from
@@ -300,9 +496,22 @@ def populate_all_probabilities(
         tokenizer: transformers tokenizer
         k: the k in "top-k"
     """
-    order = decision_tree.order()
-    for node_id in tqdm(range(order)):
-        populate_probabilities(decision_tree, node_id, model, tokenizer, k)
+    # Index the (child node ID, token ID) pairs of every node in one pass over
+    # the edges. Only nodes with successors have edges to annotate; nodes added
+    # along the way (the top k tokens) are leaves, so they are never indexed.
+    token_ids = dict(decision_tree.nodes(data="token_id"))
+    child_index: dict[int, list[tuple[int, int]]] = {}
+    for parent_id, child_id in decision_tree.edges:
+        child_index.setdefault(parent_id, []).append((child_id, token_ids[child_id]))
+    node_ids = sorted(child_index)
+
+    for node_id, probabilities in tqdm(
+        tree_token_probabilities(model, tokenizer, decision_tree, node_ids),
+        total=len(node_ids),
+    ):
+        annotate_probabilities(
+            decision_tree, node_id, probabilities, tokenizer, k, child_index[node_id]
+        )
 
 
 @memory.cache(ignore=["model", "tokenizer"])
@@ -336,8 +545,10 @@ def package_decision_tree(
 
 if __name__ == "__main__":
     my_model = AutoModelForCausalLM.from_pretrained(
-        "Qwen/Qwen2.5-Coder-0.5B-Instruct", device_map="auto"
-    )
+        "Qwen/Qwen2.5-Coder-0.5B-Instruct",
+        dtype=inference_dtype(),
+        device_map="auto",
+    ).eval()
 
     my_tokenizer = AutoTokenizer.from_pretrained(
         "Qwen/Qwen2.5-Coder-0.5B-Instruct", device_map="auto"
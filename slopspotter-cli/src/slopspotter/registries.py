@@ -1,27 +1,264 @@
 """Extract data from PyPI, NPM, and other package registries."""
 
+import contextlib
+import gzip
+import hashlib
+import http.client
 import json
+import os
+import re
+import tempfile
+import threading
+import time
 import urllib.error
+import urllib.parse
 import urllib.request
+import zlib
+from collections.abc import Collection, Mapping
 from datetime import datetime
+from functools import lru_cache
+
+from packaging.version import InvalidVersion, Version
 
 LANGUAGE_ALIASES = {
     "typescript": "javascript",
 }
 
+REGISTRY_CACHE_DIR = os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "slopspotter",
+    "registry",
+)
+"""Directory where registry JSON documents are cached between runs."""
+
+REGISTRY_CACHE_TTL = 900
+"""Number of seconds a cached registry document is reused before re-fetching it."""
+
+REPO_HOST_PATTERN = re.compile("github|gitlab|bitbucket", re.IGNORECASE)
+"""Matches project URLs that point at a source code host."""
+
+MAX_REDIRECTS = 5
+"""Maximum number of redirects followed for a single registry request."""
+
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+
+REQUEST_HEADERS = {"Accept-Encoding": "gzip", "User-Agent": "slopspotter"}
+"""Headers sent with every registry request; JSON documents compress very well."""
+
+VALIDATOR_HEADERS = {"If-None-Match": "ETag", "If-Modified-Since": "Last-Modified"}
+"""Conditional request headers & the response headers whose values they send."""
+
+_idle_connections: dict[str, list[http.client.HTTPSConnection]] = {}
+"""Idle keep-alive HTTPS connections, keyed by host and shared by all threads."""
+
+_idle_connections_lock = threading.Lock()
+
 
 def normalize_language(language: str) -> str:
     return LANGUAGE_ALIASES.get(language, language)
 
 
+@lru_cache(maxsize=4096)
+def _parse_iso(timestamp: str) -> datetime:
+    """Parse an ISO 8601 timestamp; many files of a release share the same one.
+
+    Since Python 3.11, ``datetime.fromisoformat`` accepts a trailing ``Z``.
+    """
+    return datetime.fromisoformat(timestamp)
+
+
+def _cache_path(url: str, suffix: str = ".json") -> str:
+    return os.path.join(
+        REGISTRY_CACHE_DIR, hashlib.sha1(url.encode("utf-8")).hexdigest() + suffix
+    )
+
+
+def _read_cached_json(url: str, ttl: float | None = REGISTRY_CACHE_TTL) -> dict | None:
+    """Return the cached document for ``url`` if it is younger than ``ttl``.
+
+    A ``ttl`` of ``None`` returns the cached document regardless of its age.
+    """
+    path = _cache_path(url)
+    try:
+        if ttl is not None and time.time() - os.path.getmtime(path) >= ttl:
+            return None
+        with open(path, "rb") as cache_file:
+            return json.loads(cache_file.read())
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _renew_cached_json(url: str) -> None:
+    """Restart the TTL of the cached document for ``url``; failures are ignored."""
+    with contextlib.suppress(OSError):
+        os.utime(_cache_path(url))
+
+
+def _read_cached_validators(url: str) -> dict[str, str]:
+    """Return the conditional request headers for revalidating ``url``'s cache."""
+    try:
+        with open(_cache_path(url, ".validators"), "rb") as validators_file:
+            validators = json.loads(validators_file.read())
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return {
+        header: validators[key]
+        for header, key in VALIDATOR_HEADERS.items()
+        if isinstance(validators.get(key), str)
+    }
+
+
+def _write_cache_file(path: str, raw: bytes) -> None:
+    """Atomically store ``raw`` at ``path``; failures are ignored."""
+    try:
+        os.makedirs(REGISTRY_CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=REGISTRY_CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(raw)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def _write_cached_json(url: str, raw: bytes, headers: Mapping[str, str]) -> None:
+    """Store the raw document for ``url`` along with its cache validators.
+
+    The document is written first, so validators are never newer than the
+    document they describe.
+    """
+    _write_cache_file(_cache_path(url), raw)
+    validators = {
+        key: headers.get(key) for key in VALIDATOR_HEADERS.values() if headers.get(key)
+    }
+    _write_cache_file(
+        _cache_path(url, ".validators"), json.dumps(validators).encode("utf-8")
+    )
+
+
+def _acquire_connection(host: str, timeout: float) -> http.client.HTTPSConnection:
+    """Take an idle connection to ``host`` out of the pool, or open a new one."""
+    with _idle_connections_lock:
+        idle = _idle_connections.get(host)
+        conn = idle.pop() if idle else None
+    if conn is None:
+        conn = http.client.HTTPSConnection(host, timeout=timeout)
+    conn.timeout = timeout
+    if conn.sock is not None:
+        conn.sock.settimeout(timeout)
+    return conn
+
+
+def _release_connection(host: str, conn: http.client.HTTPSConnection) -> None:
+    """Return a connection whose response was fully read to the pool."""
+    with _idle_connections_lock:
+        _idle_connections.setdefault(host, []).append(conn)
+
+
+def _decode_content(body: bytes, content_encoding: str | None) -> bytes:
+    # e.g. "304 Not Modified" responses have no body to decompress
+    if content_encoding != "gzip" or not body:
+        return body
+    try:
+        return gzip.decompress(body)
+    except (EOFError, zlib.error) as error:
+        raise http.client.HTTPException(f"Invalid gzip body: {error}") from error
+
+
+def _urlopen_get(
+    url: str, timeout: float, headers: dict[str, str]
+) -> tuple[int, bytes, Mapping[str, str]]:
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as resp:
+            encoding = resp.getheader("Content-Encoding")
+            return resp.status, _decode_content(resp.read(), encoding), resp.headers
+    except urllib.error.HTTPError as error:
+        return error.code, b"", error.headers
+
+
+def _http_get(
+    url: str, timeout: float, validators: dict[str, str] | None = None
+) -> tuple[int, bytes, Mapping[str, str]]:
+    """GET ``url`` and return the final status, body & headers, following redirects.
+
+    HTTPS requests reuse idle keep-alive connections from a per-host pool that all
+    threads share for the life of the process, so repeated lookups against one
+    registry skip the TLS handshake. Requests
+    that need a proxy (or are not HTTPS) go through ``urllib`` instead. Bodies
+    are requested gzip-compressed and returned decompressed. Conditional request
+    ``validators`` (e.g. ``If-None-Match``) are sent along with every request.
+
+    Raises:
+        OSError: On connection failures & timeouts.
+        http.client.HTTPException: On malformed responses or too many redirects.
+    """
+    headers = {**REQUEST_HEADERS, **(validators or {})}
+    for _ in range(MAX_REDIRECTS + 1):
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme != "https" or "https" in urllib.request.getproxies():
+            return _urlopen_get(url, timeout, headers)
+        path = urllib.parse.urlunsplit(("", "", parts.path or "/", parts.query, ""))
+        conn = _acquire_connection(parts.netloc, timeout)
+        try:
+            try:
+                conn.request("GET", path, headers=headers)
+                resp = conn.getresponse()
+            except (ConnectionResetError, BrokenPipeError):
+                # The server closed the idle keep-alive connection; retry on a new one
+                conn.close()
+                conn.request("GET", path, headers=headers)
+                resp = conn.getresponse()
+            body = resp.read()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            raise
+        _release_connection(parts.netloc, conn)
+        location = resp.getheader("Location")
+        if resp.status not in REDIRECT_STATUSES or not location:
+            return (
+                resp.status,
+                _decode_content(body, resp.getheader("Content-Encoding")),
+                resp.msg,
+            )
+        url = urllib.parse.urljoin(url, location)
+    raise http.client.HTTPException(f"Too many redirects for {url}")
+
+
 def fetch_json(url: str, timeout: int = 3) -> dict | None:
+    cached = _read_cached_json(url)
+    if cached is not None:
+        return cached
+    # Once the cached document expires, ask the registry whether it has changed
+    validators = _read_cached_validators(url)
     try:
-        with urllib.request.urlopen(url, timeout=timeout) as resp:
-            if resp.status != 200:
-                return None
-            return json.loads(resp.read().decode("utf-8"))
-    except (urllib.error.URLError, TimeoutError, json.JSONDecodeError):
+        status, raw, headers = _http_get(url, timeout, validators)
+        if status == 304 and validators:
+            data = _read_cached_json(url, ttl=None)
+            if data is not None:
+                # Unchanged; keep using the cached document for another TTL
+                _renew_cached_json(url)
+                return data
+            # The cached document is gone or unreadable, so fetch it in full
+            status, raw, headers = _http_get(url, timeout)
+        if status != 200:
+            return None
+        data = json.loads(raw.decode("utf-8"))
+    except (http.client.HTTPException, OSError, json.JSONDecodeError):
         return None
+    _write_cached_json(url, raw, headers)
+    return data
+
+
+def _latest_version(versions: Collection[str]) -> str:
+    """Return the newest of the given PEP 440 versions.
+
+    Versions are compared as strings if any of them is not valid PEP 440, as is
+    the case for some very old PyPI releases.
+    """
+    try:
+        return max(versions, key=Version)
+    except InvalidVersion:
+        return max(versions)
 
 
 def extract_pypi_signals(name: str) -> dict:
@@ -29,28 +266,29 @@ def extract_pypi_signals(name: str) -> dict:
     if not data:
         return {"exists": False}
     releases = data.get("releases", {}) or {}
-    dates = []
+    # Track the oldest & newest upload in one pass instead of sorting every date
+    first_release = last_release = None
     for files in releases.values():
         for file in files or []:
             upload_time = file.get("upload_time")
-            if upload_time:
-                try:
-                    dates.append(
-                        datetime.fromisoformat(upload_time.replace("Z", "+00:00"))
-                    )
-                except ValueError:
-                    continue
-    dates.sort()
-    first_release = dates[0] if dates else None
-    last_release = dates[-1] if dates else None
-    latest_files = releases.get(sorted(releases.keys())[-1], []) if releases else []
-    has_sdist = any(f.get("packagetype") == "sdist" for f in latest_files or [])
-    has_only_wheels = bool(latest_files) and all(
-        f.get("packagetype") == "bdist_wheel" for f in latest_files or []
-    )
-    project_urls = data.get("info", {}).get("project_urls", {}) or {}
+            if not upload_time:
+                continue
+            try:
+                uploaded = _parse_iso(upload_time)
+            except ValueError:
+                continue
+            if first_release is None or uploaded < first_release:
+                first_release = uploaded
+            if last_release is None or uploaded > last_release:
+                last_release = uploaded
+    latest_files = releases[_latest_version(releases)] if releases else []
+    # One pass: wheels-only means the latest release has files, and all are wheels
+    package_types = {f.get("packagetype") for f in latest_files or []}
+    has_only_wheels = package_types == {"bdist_wheel"}
+    info = data.get("info") or {}
+    project_urls = info.get("project_urls") or {}
     homepage = (
-        data.get("info", {}).get("home_page")
+        info.get("home_page")
         or project_urls.get("Homepage")
         or project_urls.get("home")
     )
@@ -72,19 +310,18 @@ def extract_pypi_signals(name: str) -> dict:
             (
                 url
                 for url in project_urls.values()
-                if isinstance(url, str)
-                and ("github" in url.lower() or "gitlab" in url.lower() or "bitbucket" in url.lower())
+                if isinstance(url, str) and REPO_HOST_PATTERN.search(url)
             ),
             None,
         )
-    license_text = (data.get("info", {}) or {}).get("license") or ""
+    license_text = info.get("license") or ""
 
     return {
         "exists": True,
         "firstRelease": first_release,
         "lastRelease": last_release,
         "releaseCount": len(releases),
-        "hasOnlyWheels": has_only_wheels and not has_sdist,
+        "hasOnlyWheels": has_only_wheels,
         "homepage": homepage,
         "repo": repo,
         "license": license_text if license_text and "unknown" not in license_text.lower() else "",
@@ -99,19 +336,22 @@ def extract_npm_signals(name: str) -> dict:
         return {"exists": False}
 
     time = registry.get("time", {}) or {}
-    version_dates = []
+    first_release = last_release = None
+    release_count = 0
     for key, value in time.items():
         if key in ("created", "modified"):
             continue
         if not isinstance(value, str):
             continue
         try:
-            version_dates.append(datetime.fromisoformat(value.replace("Z", "+00:00")))
+            released = _parse_iso(value)
         except ValueError:
             continue
-    version_dates.sort()
-    first_release = version_dates[0] if version_dates else None
-    last_release = version_dates[-1] if version_dates else None
+        release_count += 1
+        if first_release is None or released < first_release:
+            first_release = released
+        if last_release is None or released > last_release:
+            last_release = released
     latest_version = (registry.get("dist-tags") or {}).get("latest")
     latest_meta = (
         (registry.get("versions") or {}).get(latest_version, {})
@@ -137,7 +377,7 @@ def extract_npm_signals(name: str) -> dict:
         "exists": True,
         "firstRelease": first_release,
         "lastRelease": last_release,
-        "releaseCount": len(version_dates),
+        "releaseCount": release_count,
         "hasInstallScripts": has_install_scripts,
         "repo": repo,
         "homepage": homepage,
@@ -156,16 +396,12 @@ def extract_crates_signals(name: str) -> dict:
     last_release = None
     if crate.get("created_at"):
         try:
-            first_release = datetime.fromisoformat(
-                crate["created_at"].replace("Z", "+00:00")
-            )
+            first_release = _parse_iso(crate["created_at"])
         except ValueError:
             pass
     if crate.get("updated_at"):
         try:
-            last_release = datetime.fromisoformat(
-                crate["updated_at"].replace("Z", "+00:00")
-            )
+            last_release = _parse_iso(crate["updated_at"])
         except ValueError:
             pass
     return {
@@ -182,46 +418,48 @@ def extract_crates_signals(name: str) -> dict:
 
 def extract_go_signals(name: str) -> dict:
     try:
-        with urllib.request.urlopen(
-            f"https://proxy.golang.org/{name}/@v/list", timeout=3
-        ) as resp:
-            if resp.status != 200:
-                return {"exists": False}
-            versions = [
-                line.strip()
-                for line in resp.read().decode("utf-8").splitlines()
-                if line.strip()
-            ]
-            return {
-                "exists": True,
-                "releaseCount": len(versions),
-                "repo": f"https://pkg.go.dev/{name}" if "." in name else None,
-                "metadataUrl": registry_url_for(name, "go"),
-            }
-    except urllib.error.URLError:
+        status, raw, _ = _http_get(f"https://proxy.golang.org/{name}/@v/list", 3)
+    except (http.client.HTTPException, OSError):
+        return {"exists": False}
+    if status != 200:
         return {"exists": False}
+    versions = [
+        line.strip() for line in raw.decode("utf-8").splitlines() if line.strip()
+    ]
+    return {
+        "exists": True,
+        "releaseCount": len(versions),
+        "repo": f"https://pkg.go.dev/{name}" if "." in name else None,
+        "metadataUrl": registry_url_for(name, "go"),
+    }
+
+
+REGISTRY_PAGE_URLS = {
+    "python": "https://pypi.org/project/{}/",
+    "javascript": "https://www.npmjs.com/package/{}",
+    "rust": "https://crates.io/crates/{}",
+    "go": "https://pkg.go.dev/{}",
+}
+"""Templates for the human-readable registry page of a package, by language."""
 
 
+@lru_cache(maxsize=4096)
 def registry_url_for(name: str, language: str) -> str | None:
-    language = normalize_language(language)
-    if language == "python":
-        return f"https://pypi.org/project/{name}/"
-    if language == "javascript":
-        return f"https://www.npmjs.com/package/{name}"
-    if language == "rust":
-        return f"https://crates.io/crates/{name}"
-    if language == "go":
-        return f"https://pkg.go.dev/{name}"
-    return None
+    template = REGISTRY_PAGE_URLS.get(normalize_language(language))
+    return template.format(name) if template else None
+
+
+REGISTRY_EXTRACTORS = {
+    "python": extract_pypi_signals,
+    "javascript": extract_npm_signals,
+    "rust": extract_crates_signals,
+    "go": extract_go_signals,
+}
+"""Registry signal extractors, by (normalized) language."""
 
 
 def extract_registry_signals(name: str, language: str):
-    language = normalize_language(language)
-    if language == "python":
-        return extract_pypi_signals(name)
-    if language == "javascript":
-        return extract_npm_signals(name)
-    if language == "rust":
-        return extract_crates_signals(name)
-    if language == "go":
-        return extract_go_signals(name)
+    extractor = REGISTRY_EXTRACTORS.get(normalize_language(language))
+    if extractor is None:
+        return None
+    return extractor(name)
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict, dataclass
 from typing import Any
 
@@ -21,6 +22,28 @@ from slopspotter.signals import (
 HIGH_THRESHOLD = 0.7
 MEDIUM_THRESHOLD = 0.4
 
+STDLIB_SIGNALS: dict[str, dict[str, Any]] = {
+    "registry": asdict(SignalResult(0.0, "Stdlib")),
+    "name": asdict(SignalResult(0.0, "Stdlib")),
+    "install": asdict(SignalResult(0.0, "Stdlib")),
+    "metadata": asdict(SignalResult(0.0, "Stdlib")),
+}
+"""Serialized signals of a stdlib module; the "name" entry is replaced per package."""
+
+NOT_FOUND_SIGNALS: dict[str, dict[str, Any]] = {
+    "registry": asdict(SignalResult(1.0, "Not found in registry")),
+    "name": asdict(SignalResult(0.0, "Not evaluated")),
+    "install": asdict(SignalResult(0.0, "Not evaluated")),
+    "metadata": asdict(SignalResult(0.0, "Not evaluated")),
+}
+"""Serialized signals of a package that is missing from its registry."""
+
+NAME_SIGNAL_CACHE_SIZE = 4096
+"""Maximum number of name signals kept in memory by ``score_package``."""
+
+REGISTRY_FETCH_WORKERS = 8
+"""Maximum number of registry lookups in flight for one check-packages request."""
+
 
 def handle_check_packages(
     payload: FrontendQuestion, tokenizer: PreTrainedTokenizer
@@ -30,36 +53,59 @@ def handle_check_packages(
     Placeholder scorer: returns "unknown" risk so the pipeline remains wired.
     Replace this with a real classifier to override the frontend heuristic.
     """
-    snippet_id = payload.get("snippetId", "")
-    packages = payload.get("packages", []) or []
-
-    formatted = []
-    for pkg in packages:
-        name = pkg.get("name", "")
-        language = pkg.get("language", "")
-        meta = extract_registry_signals(name, language)
+    return handle_check_packages_batch([payload], tokenizer)[0]
+
+
+def handle_check_packages_batch(
+    payloads: list[FrontendQuestion], tokenizer: PreTrainedTokenizer
+) -> list[BackendResponse]:
+    """Build the responses for several check-packages commands at once.
+
+    Packages are deduplicated across all payloads, so each distinct package is
+    looked up and scored once, and all registry lookups share one thread pool.
+    """
+    requests = [
+        [
+            (pkg.get("name", ""), pkg.get("language", ""))
+            for pkg in payload.get("packages", []) or []
+        ]
+        for payload in payloads
+    ]
+    # A snippet may mention the same package several times; look up & score it once
+    unique = list(dict.fromkeys(pair for requested in requests for pair in requested))
+    names = [name for name, _ in unique]
+    languages = [language for _, language in unique]
+    # Registry lookups are network-bound, so run them concurrently; scoring (which
+    # uses the tokenizer) stays on this thread.
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(len(unique), REGISTRY_FETCH_WORKERS))
+    ) as executor:
+        metas = list(executor.map(extract_registry_signals, names, languages))
+
+    results = {}
+    for name, language, meta in zip(names, languages, metas, strict=True):
         pkg_score = score_package(
             name=name, language=language, meta=meta, tokenizer=tokenizer
         )
-        formatted.append(
-            {
-                "name": name,
-                "language": language,
-                "result": {
-                    "riskLevel": pkg_score.riskLevel,
-                    "score": pkg_score.score,
-                    "summary": pkg_score.summary,
-                    "metadataUrl": pkg_score.metadataUrl,
-                    "signals": pkg_score.signals,
-                },
-            }
-        )
+        results[name, language] = {
+            "riskLevel": pkg_score.riskLevel,
+            "score": pkg_score.score,
+            "summary": pkg_score.summary,
+            "metadataUrl": pkg_score.metadataUrl,
+            "signals": pkg_score.signals,
+        }
 
-    return {
-        "snippetId": snippet_id,
-        "packages": formatted,
-        "warning": None,
-    }
+    return [
+        {
+            "snippetId": payload.get("snippetId", ""),
+            "packages": [
+                {"name": name, "language": language, "result": results[name, language]}
+                for name, language in requested
+            ],
+            "warning": None,
+        }
+        for payload, requested in zip(payloads, requests, strict=True)
+    ]
 
 
 @dataclass
@@ -113,23 +159,25 @@ def score_package(
     meta: dict[str, Any] | None = None,
     tokenizer: PreTrainedTokenizer | None = None,
 ) -> PackageScore:
-    """Calculate a risk score for a single package."""
+    """Calculate a risk score for a single package.
+
+    Stdlib modules are returned right away. The name signal (word list &
+    tokenizer vocabulary checks) is memoized by name & tokenizer checkpoint,
+    since the same packages keep showing up in snippets.
+    """
     # Stdlib override
     allow = stdlib_allowlist(name, language)
     if allow:
-        signals = {
-            "registry": SignalResult(0.0, "Stdlib"),
-            "name": allow,
-            "install": SignalResult(0.0, "Stdlib"),
-            "metadata": SignalResult(0.0, "Stdlib"),
-        }
         return PackageScore(
             name=name,
             language=language,
             score=0.0,
             riskLevel="low",
             summary="Stdlib module",
-            signals={k: asdict(v) for k, v in signals.items()},
+            signals={
+                **{k: dict(v) for k, v in STDLIB_SIGNALS.items()},
+                "name": asdict(allow),
+            },
             metadataUrl=(meta or {}).get("metadataUrl"),
         )
 
@@ -139,7 +187,7 @@ def score_package(
 
     signals = {
         "registry": registry_signal(meta),
-        "name": name_signal(name, tokenizer),
+        "name": _cached_name_signal(name, tokenizer),
         "install": install_signal(meta),
         "metadata": metadata_signal(meta),
     }
@@ -159,25 +207,36 @@ def score_package(
     )
 
 
+_name_signals: dict[tuple[str, str | None], SignalResult] = {}
+"""Memoized name signals, keyed by package name & tokenizer checkpoint."""
+
+
+def _cached_name_signal(
+    name: str, tokenizer: PreTrainedTokenizer | None
+) -> SignalResult:
+    """Return ``name_signal(name, tokenizer)``, computing it once per checkpoint."""
+    key = (name, getattr(tokenizer, "name_or_path", None))
+    if key not in _name_signals:
+        if len(_name_signals) >= NAME_SIGNAL_CACHE_SIZE:
+            # Evict the oldest entry
+            del _name_signals[next(iter(_name_signals))]
+        _name_signals[key] = name_signal(name, tokenizer)
+    return _name_signals[key]
+
+
 def _check_shortcuts(
     name: str, language: str, meta: dict[str, Any] | None
 ) -> PackageScore | None:
     """Return a forced high-risk score for hard-stop conditions."""
     if meta and meta.get("exists") is False:
         summary = "Package not found in registry; cannot verify publisher."
-        signals = {
-            "registry": asdict(SignalResult(1.0, "Not found in registry")),
-            "name": asdict(SignalResult(0.0, "Not evaluated")),
-            "install": asdict(SignalResult(0.0, "Not evaluated")),
-            "metadata": asdict(SignalResult(0.0, "Not evaluated")),
-        }
         return PackageScore(
             name=name,
             language=language,
             score=1.0,
             riskLevel="high",
             summary=summary,
-            signals=signals,
+            signals={k: dict(v) for k, v in NOT_FOUND_SIGNALS.items()},
             metadataUrl=(meta or {}).get("metadataUrl"),
         )
     return None
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import logging
+import re
 import sys
 from dataclasses import dataclass
 from typing import Any
@@ -14,89 +15,105 @@ from slopspotter.words import in_unix_words
 
 NAME_TOKENS = ["installer", "updater", "crypto", "mining", "hack", "typo"]
 
-PYTHON_STDLIB = {
-    "abc",
-    "argparse",
-    "array",
-    "asyncio",
-    "base64",
-    "collections",
-    "concurrent",
-    "contextlib",
-    "copy",
-    "csv",
-    "datetime",
-    "enum",
-    "functools",
-    "getopt",
-    "getpass",
-    "glob",
-    "gzip",
-    "hashlib",
-    "heapq",
-    "html",
-    "http",
-    "importlib",
-    "io",
-    "ipaddress",
-    "itertools",
-    "json",
-    "logging",
-    "math",
-    "os",
-    "pathlib",
-    "pickle",
-    "platform",
-    "plistlib",
-    "queue",
-    "random",
-    "re",
-    "sched",
-    "secrets",
-    "shutil",
-    "signal",
-    "socket",
-    "sqlite3",
-    "ssl",
-    "statistics",
-    "string",
-    "subprocess",
-    "sys",
-    "tempfile",
-    "textwrap",
-    "threading",
-    "time",
-    "typing",
-    "uuid",
-    "xml",
-    "zipfile",
-}
-
-GO_STDLIB = {
-    "fmt",
-    "http",
-    "net/http",
-    "encoding/json",
-    "encoding/xml",
-    "encoding/base64",
-    "bufio",
-    "log",
-    "math/rand",
-    "strings",
-    "strconv",
-    "errors",
-    "strings",
-    "io",
-    "os",
-    "math",
-    "time",
-    "bytes",
-    "crypto",
-}
-
-RUST_STDLIB = {
-    "std",
+NAME_TOKENS_PATTERN = re.compile("|".join(map(re.escape, NAME_TOKENS)))
+"""Matches any of the ``NAME_TOKENS`` in a single scan of a package name."""
+
+PYTHON_STDLIB = frozenset(
+    {
+        "abc",
+        "argparse",
+        "array",
+        "asyncio",
+        "base64",
+        "collections",
+        "concurrent",
+        "contextlib",
+        "copy",
+        "csv",
+        "datetime",
+        "enum",
+        "functools",
+        "getopt",
+        "getpass",
+        "glob",
+        "gzip",
+        "hashlib",
+        "heapq",
+        "html",
+        "http",
+        "importlib",
+        "io",
+        "ipaddress",
+        "itertools",
+        "json",
+        "logging",
+        "math",
+        "os",
+        "pathlib",
+        "pickle",
+        "platform",
+        "plistlib",
+        "queue",
+        "random",
+        "re",
+        "sched",
+        "secrets",
+        "shutil",
+        "signal",
+        "socket",
+        "sqlite3",
+        "ssl",
+        "statistics",
+        "string",
+        "subprocess",
+        "sys",
+        "tempfile",
+        "textwrap",
+        "threading",
+        "time",
+        "typing",
+        "uuid",
+        "xml",
+        "zipfile",
+    }
+)
+
+GO_STDLIB = frozenset(
+    {
+        "fmt",
+        "http",
+        "net/http",
+        "encoding/json",
+        "encoding/xml",
+        "encoding/base64",
+        "bufio",
+        "log",
+        "math/rand",
+        "strings",
+        "strconv",
+        "errors",
+        "strings",
+        "io",
+        "os",
+        "math",
+        "time",
+        "bytes",
+        "crypto",
+    }
+)
+
+RUST_STDLIB = frozenset(
+    {
+        "std",
+    }
+)
+
+STDLIB_ALLOWLISTS: dict[str, tuple[frozenset[str], str]] = {
+    "python": (PYTHON_STDLIB, "Python stdlib module"),
+    "go": (GO_STDLIB, "Go stdlib package"),
+    "rust": (RUST_STDLIB, "Rust stdlib crate"),
 }
+"""Standard library names & the override reason for each supported language."""
 
 
 @dataclass
@@ -109,14 +126,12 @@ class SignalResult:
 
 def stdlib_allowlist(name: str, language: str) -> SignalResult | None:
     """Return a low-risk override if a package is a known stdlib module."""
-    lowered = (name or "").strip().lower()
-    lang = (language or "").strip().lower()
-    if lang == "python" and lowered in PYTHON_STDLIB:
-        return SignalResult(0.0, "Python stdlib module")
-    if lang == "go" and lowered in GO_STDLIB:
-        return SignalResult(0.0, "Go stdlib package")
-    if lang == "rust" and lowered in RUST_STDLIB:
-        return SignalResult(0.0, "Rust stdlib crate")
+    allowlist = STDLIB_ALLOWLISTS.get((language or "").strip().lower())
+    if allowlist is None:
+        return None
+    modules, reason = allowlist
+    if (name or "").strip().lower() in modules:
+        return SignalResult(0.0, reason)
     return None
 
 
@@ -138,10 +153,10 @@ def name_signal(
         in_words = in_unix_words(name)
     if in_words:
         reasons.append("Found in system word list")
-        logging.debug(f"Package name {name} is present in system word list")
+        logging.debug("Package name %s is present in system word list", name)
     else:
         reasons.append("Missing from system word list")
-        logging.debug(f"Package name {name} is not present in system word list")
+        logging.debug("Package name %s is not present in system word list", name)
 
     # Check if the package is inside the tokenizer's vocabulary
 
@@ -150,17 +165,17 @@ def name_signal(
         in_vocab = package_in_vocabulary(tokenizer, name)
     if in_vocab:
         reasons.append("Found in tokenizer vocabulary")
-        logging.debug(f"Package name {name} is present in tokenizer vocabulary")
+        logging.debug("Package name %s is present in tokenizer vocabulary", name)
     else:
         reasons.append("Missing from tokenizer vocabulary")
-        logging.debug(f"Package name {name} is not present in tokenizer vocabulary")
+        logging.debug("Package name %s is not present in tokenizer vocabulary", name)
 
     if not (in_vocab and not in_words):
         risk += 0.1
-    if any(token in lowered for token in NAME_TOKENS):
+    if NAME_TOKENS_PATTERN.search(lowered):
         risk += 0.4
         reasons.append("Suspicious token")
-    if any(char.isdigit() for char in lowered):
+    if any(map(str.isdigit, lowered)):
         risk += 0.2
         reasons.append("Contains digits")
     if "-" in lowered:
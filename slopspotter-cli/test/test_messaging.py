@@ -0,0 +1,106 @@
+"""Test suite for native messaging."""
+
+import os
+import sys
+import threading
+import unittest
+from unittest import mock
+
+from slopspotter import messaging
+from slopspotter.messaging import (
+    PONG_MESSAGE,
+    STDIN_READ_SIZE,
+    NativeMessage,
+    stdin_has_message,
+)
+
+
+class TestNativeMessage(unittest.TestCase):
+    """Test suite for encoding & decoding native messages."""
+
+    def setUp(self):
+        """Replace STDIN with a pipe that the test can write frames into.
+
+        The module's STDIN buffer is replaced too, so that bytes left over by one
+        test never leak into the next.
+        """
+        read_fd, self.write_fd = os.pipe()
+        stdin = self.enterContext(os.fdopen(read_fd))
+        self.enterContext(mock.patch.object(sys, "stdin", stdin))
+        self.enterContext(
+            mock.patch.multiple(
+                messaging,
+                _stdin_buffer=bytearray(STDIN_READ_SIZE),
+                _stdin_start=0,
+                _stdin_end=0,
+            )
+        )
+
+    def tearDown(self):
+        """Close the write end of the pipe, if the test did not already."""
+        if self.write_fd is not None:
+            os.close(self.write_fd)
+
+    def close_writer(self):
+        """Close the write end of the pipe to simulate the browser exiting."""
+        os.close(self.write_fd)
+        self.write_fd = None
+
+    def test_from_stdin_round_trip(self):
+        """Consecutive frames written in one chunk are decoded in order."""
+        contents = ["ping", {"snippetId": "snippet-1", "packages": []}, [1, 2, 3]]
+        frames = b"".join(
+            message.frame for message in map(NativeMessage.from_content, contents)
+        )
+        os.write(self.write_fd, frames)
+        self.close_writer()
+
+        for content in contents:
+            self.assertEqual(NativeMessage.from_stdin().content, content)
+        with self.assertRaises(EOFError):
+            NativeMessage.from_stdin()
+
+    def test_from_stdin_large_message(self):
+        """A message larger than the STDIN read buffer is decoded intact."""
+        content = {"snippetId": "x" * (4 * STDIN_READ_SIZE)}
+        frame = NativeMessage.from_content(content).frame
+        # The pipe holds less than the frame, so write it from another thread
+        writer = threading.Thread(target=os.write, args=(self.write_fd, frame))
+        writer.start()
+        self.assertEqual(NativeMessage.from_stdin().content, content)
+        writer.join()
+
+    def test_from_stdin_closed(self):
+        """A closed STDIN raises EOFError instead of returning a bogus message."""
+        self.close_writer()
+        with self.assertRaises(EOFError):
+            NativeMessage.from_stdin()
+
+    @unittest.skipIf(sys.platform == "win32", "select() does not support pipes")
+    def test_stdin_has_message(self):
+        """Buffered or pending frames are reported as ready; an idle pipe is not."""
+        self.assertFalse(stdin_has_message())
+        os.write(self.write_fd, PONG_MESSAGE.frame * 2)
+        self.assertTrue(stdin_has_message())
+        NativeMessage.from_stdin()
+        # The second frame was read in the same block and is still buffered
+        self.assertTrue(stdin_has_message())
+        NativeMessage.from_stdin()
+        self.assertFalse(stdin_has_message())
+
+    def test_to_stdout(self):
+        """A message written to STDOUT is framed with its native-order length."""
+        read_fd, write_fd = os.pipe()
+        with (
+            os.fdopen(write_fd, "w") as stdout,
+            mock.patch.object(sys, "stdout", stdout),
+        ):
+            NativeMessage.from_content({"snippetId": "snippet-1"}).to_stdout()
+        with os.fdopen(read_fd, "rb") as pipe:
+            frame = pipe.read()
+        self.assertEqual(frame[:4], (len(frame) - 4).to_bytes(4, sys.byteorder))
+        self.assertEqual(frame[4:], b'{"snippetId":"snippet-1"}')
+
+
+if __name__ == "__main__":
+    unittest.main()
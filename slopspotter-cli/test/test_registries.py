@@ -0,0 +1,76 @@
+"""Test suite for the registry JSON cache."""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from slopspotter import registries
+from slopspotter.registries import fetch_json
+
+URL = "https://registry.example/pkg"
+
+
+class TestFetchJson(unittest.TestCase):
+    """Test suite for ``fetch_json``'s TTL cache & ETag revalidation."""
+
+    def setUp(self):
+        """Point the cache at a temporary directory & stub out the network."""
+        cache_dir = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(
+            mock.patch.object(registries, "REGISTRY_CACHE_DIR", cache_dir)
+        )
+        self.http_get = self.enterContext(
+            mock.patch.object(registries, "_http_get", autospec=True)
+        )
+
+    def expire_cache(self):
+        """Make the cached document older than the TTL."""
+        os.utime(registries._cache_path(URL), (0, 0))
+
+    def test_cache_hit(self):
+        """A fresh cached document is returned without a request."""
+        self.http_get.return_value = (200, b'{"name": "pkg"}', {})
+        self.assertEqual(fetch_json(URL), {"name": "pkg"})
+        self.assertEqual(fetch_json(URL), {"name": "pkg"})
+        self.http_get.assert_called_once_with(URL, 3, {})
+
+    def test_not_found(self):
+        """A 404 is reported as missing & not cached."""
+        self.http_get.return_value = (404, b"", {})
+        self.assertIsNone(fetch_json(URL))
+        self.assertIsNone(fetch_json(URL))
+        self.assertEqual(self.http_get.call_count, 2)
+
+    def test_not_modified(self):
+        """An expired document is revalidated & reused when it did not change."""
+        self.http_get.return_value = (200, b'{"name": "pkg"}', {"ETag": '"v1"'})
+        fetch_json(URL)
+        self.expire_cache()
+
+        self.http_get.return_value = (304, b"", {})
+        self.assertEqual(fetch_json(URL), {"name": "pkg"})
+        self.http_get.assert_called_with(URL, 3, {"If-None-Match": '"v1"'})
+        # The 304 restarted the TTL, so the next lookup is a cache hit
+        self.assertEqual(fetch_json(URL), {"name": "pkg"})
+        self.assertEqual(self.http_get.call_count, 2)
+
+    def test_not_modified_without_cached_body(self):
+        """A 304 without a usable cached document falls back to a full request."""
+        self.http_get.return_value = (200, b'{"name": "pkg"}', {"ETag": '"v1"'})
+        fetch_json(URL)
+        os.remove(registries._cache_path(URL))
+
+        self.http_get.side_effect = [
+            (304, b"", {}),
+            (200, b'{"name": "pkg2"}', {"ETag": '"v2"'}),
+        ]
+        self.assertEqual(fetch_json(URL), {"name": "pkg2"})
+        self.assertEqual(
+            self.http_get.call_args_list[1:],
+            [mock.call(URL, 3, {"If-None-Match": '"v1"'}), mock.call(URL, 3)],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""Test suite for batched package scoring."""
+
+import unittest
+from unittest import mock
+
+from slopspotter import scoring
+from slopspotter.scoring import handle_check_packages_batch, score_package
+from slopspotter.signals import SignalResult
+
+
+class TestScoringBatch(unittest.TestCase):
+    """Test suite for deduplication & memoization of package scores."""
+
+    def setUp(self):
+        """Stub out registry lookups & name checks, and empty the name memo."""
+        self.extract = self.enterContext(
+            mock.patch.object(
+                scoring,
+                "extract_registry_signals",
+                autospec=True,
+                return_value={"exists": False},
+            )
+        )
+        self.name_signal = self.enterContext(
+            mock.patch.object(
+                scoring,
+                "name_signal",
+                autospec=True,
+                return_value=SignalResult(0.0, "Benign name"),
+            )
+        )
+        self.enterContext(mock.patch.dict(scoring._name_signals, clear=True))
+
+    def test_batch_deduplicates_lookups(self):
+        """Each distinct package is looked up once across all payloads."""
+        foo = {"name": "foo", "language": "python"}
+        bar = {"name": "bar", "language": "python"}
+        responses = handle_check_packages_batch(
+            [
+                {"snippetId": "a", "packages": [foo, bar, foo]},
+                {"snippetId": "b", "packages": [bar]},
+            ],
+            tokenizer=None,
+        )
+
+        self.assertCountEqual(
+            self.extract.call_args_list,
+            [mock.call("foo", "python"), mock.call("bar", "python")],
+        )
+        self.assertEqual([r["snippetId"] for r in responses], ["a", "b"])
+        self.assertEqual(
+            [p["name"] for p in responses[0]["packages"]], ["foo", "bar", "foo"]
+        )
+        self.assertEqual([p["name"] for p in responses[1]["packages"]], ["bar"])
+        self.assertEqual(responses[0]["packages"][0]["result"]["riskLevel"], "high")
+
+    def test_batch_empty(self):
+        """A payload without packages gets an empty response."""
+        responses = handle_check_packages_batch(
+            [{"snippetId": "a", "packages": []}], tokenizer=None
+        )
+        self.assertEqual(responses[0]["packages"], [])
+        self.extract.assert_not_called()
+
+    def test_name_signal_memoized(self):
+        """A package's name is only checked once, but every score is a new object."""
+        meta = {"exists": True, "repo": "https://github.com/a/b"}
+        first = score_package("left-pad", "javascript", meta=meta)
+        second = score_package("left-pad", "javascript", meta={"exists": True})
+        self.name_signal.assert_called_once()
+        self.assertIsNot(first, second)
+        self.assertIsNot(first.signals["name"], second.signals["name"])
+        self.assertEqual(first.signals["name"], second.signals["name"])
+
+        score_package("right-pad", "javascript", meta=meta)
+        self.assertEqual(self.name_signal.call_count, 2)
+
+    def test_stdlib_not_scored(self):
+        """Stdlib modules skip the signals entirely."""
+        result = score_package("json", "python")
+        self.assertEqual(result.riskLevel, "low")
+        self.assertEqual(result.signals["name"]["reason"], "Python stdlib module")
+        self.name_signal.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()